@@ -0,0 +1,297 @@
+"""
+cli.py
+velaris-parity: one entry point for every validator.
+  python -m src <command> ...        (or python -m src.cli, from the repo root)
+
+Commands:
+  list                      objects and the workbook each one would validate
+  run [objects] [--cache] [--xlsx] [--sample RATE]
+                            validate objects, write output/<object>/
+  watch [objects]           re-validate on file change (see watcher.py)
+  nway CONFIG               several source systems against Velaris in one pass
+  bench [objects]           startup time (-X importtime) + load/validate timings
+  cache info|clear          manage the parsed-workbook cache used by run --cache
+
+Only argparse/pathlib are imported up front; pandas, openpyxl and dateutil are loaded by the
+commands that actually read data, so list/cache/--help return immediately.
+"""
+
+import argparse
+import importlib
+import signal
+import sys
+import time
+from pathlib import Path
+
+from src.validators import VALIDATORS, find_workbook
+
+PROG = "velaris-parity"
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = Path("data")
+OUTPUT_DIR = Path("output")
+CACHE_DIR = Path(".parity_cache")
+MAPPINGS_DIR = Path("mappings")
+
+
+def pick_objects(ap, names):
+    unknown = [n for n in names if n not in VALIDATORS]
+    if unknown:
+        ap.error(f"unknown object(s): {', '.join(unknown)} (choose from {', '.join(VALIDATORS)})")
+    return list(names or VALIDATORS)
+
+
+def cmd_list(args):
+    for name in VALIDATORS:
+        book = find_workbook(Path(args.data_dir) / name)
+        print(f"{name:<15} {book if book else '(no workbook in ' + str(Path(args.data_dir) / name) + ')'}")
+    return 0
+
+
+def run_options(args):
+    """Engine options (core.engine.validate_frames keywords) selected on the command line."""
+    options = {}
+    if args.sample is not None:
+        options["sample"] = args.sample
+        if args.strata:
+            options["strata"] = args.strata
+    for key in ("max_per_field", "max_details"):
+        if getattr(args, key) is not None:
+            options[key] = getattr(args, key)
+    if args.fail_fast is not None:
+        options["fail_fast"] = args.fail_fast
+        options["fail_min_rows"] = args.fail_min_rows
+    return options
+
+
+def cmd_run(args):
+    if args.cache:
+        from src.core import parse_cache
+        parse_cache.enable(args.cache_dir)
+    from src.core import progress as live
+    token = live.CancelToken()
+    previous_handler = live.cancel_on_sigint(token)
+    render = progress_renderer(args.progress)
+    failed = 0
+    try:
+        for name in args.objects:
+            path = Path(args.path) if args.path else find_workbook(Path(args.data_dir) / name)
+            if path is None:
+                print(f"[{name}] no workbook in {Path(args.data_dir) / name}, skipping")
+                continue
+            module = importlib.import_module(VALIDATORS[name])
+            from src.core.comparators import load_rules
+            from src.core.engine import ParityAborted
+            from src.core.sheet_loader import row_count
+            print(f"[{name}] loading", path)
+            progress = live.Progress(render, token, label=name)
+            try:
+                options = run_options(args)
+                rules = load_rules(Path(args.mappings_dir) / f"{name}.json")
+                if rules:
+                    options["rules"] = rules
+                progress.stage("load", row_count(path))
+                state = module.load(path, progress=progress)
+                progress.complete()
+                module.run(state, Path(args.output_dir) / name, xlsx=args.xlsx, progress=progress, **options)
+            except ParityAborted as e:
+                print(f"[{name}] {e}")
+                failed += 1
+            except live.Cancelled:
+                pass  # stopped while parsing: nothing to report yet
+            except Exception as e:
+                print(f"[{name}] ERROR: {e}")
+                failed += 1
+            if token.cancelled:
+                written = "no reports written" if progress.name == "load" else "partial reports written"
+                print(f"[{name}] cancelled during {progress.name}: {written}, remaining objects skipped")
+                return 130
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    return 1 if failed else 0
+
+
+def progress_renderer(mode):
+    from src.core import progress as live
+    if mode == "auto":
+        mode = "bar" if sys.stderr.isatty() else "none"
+    return {"bar": live.progress_bar(), "json": live.json_lines()}.get(mode)
+
+
+def cmd_watch(args):
+    from src import watcher
+    watcher.watch(args.data_dir, args.output_dir, args.objects, args.interval, args.debounce, args.max_memory_mb)
+    return 0
+
+
+def cmd_nway(args):
+    if args.cache:
+        from src.core import parse_cache
+        parse_cache.enable(args.cache_dir)
+    from src.core import progress as live
+    from src.core.nway import load_config, validate_nway
+    from src.core.report_writer import csv_sink
+    vel_df, vel_id_col, sources, outdir = load_config(args.config)
+    outdir = Path(args.out) if args.out else outdir
+    token = live.CancelToken()
+    previous_handler = live.cancel_on_sigint(token)
+    try:
+        progress = live.Progress(progress_renderer(args.progress), token, label="nway")
+        results = validate_nway(vel_df, vel_id_col, sources, sink=csv_sink(outdir), progress=progress)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    summary = results["summary"]
+    if "cancelled" in summary:
+        print(f"[nway] cancelled during {summary['cancelled']}: partial reports written to", outdir)
+        return 130
+    print(f"[nway] {summary['velaris_records']} Velaris records vs {', '.join(sources)}")
+    for name, t in summary["systems"].items():
+        print(f"[nway] {name}: agree {t['agree']}, disagree {t['disagree']}, absent {t['absent']}, "
+              f"not in Velaris {t['not_in_velaris']} ({t['mismatches']} differing fields)")
+    print("[nway] reports written to", outdir)
+    return 0
+
+
+def import_times(stderr):
+    """Parse `-X importtime` output into [(cumulative_us, module)] for top-level imports."""
+    rows = []
+    for line in stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or "cumulative" in line:
+            continue
+        if parts[2].startswith("  "):
+            continue  # nested import, already counted in its parent's cumulative time
+        rows.append((int(parts[1]), parts[2].strip()))
+    return rows
+
+
+def bench_startup(repeat):
+    import subprocess
+    walls = []
+    stderr = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.cli", "list"],
+                              cwd=ROOT, capture_output=True, text=True)
+        walls.append(time.perf_counter() - started)
+        stderr = proc.stderr
+    rows = import_times(stderr)
+    loaded = {line.rsplit("|", 1)[-1].strip() for line in stderr.splitlines() if line.startswith("import time:")}
+    heavy = [m for m in ("pandas", "numpy", "openpyxl", "dateutil") if m in loaded]
+    print(f"[bench] startup `{PROG} list`: best {min(walls) * 1000:.0f} ms over {repeat} runs "
+          f"(imports {sum(us for us, _ in rows) / 1000:.0f} ms)")
+    for us, mod in sorted(rows, reverse=True)[:5]:
+        print(f"[bench]   {mod:<30} {us / 1000:7.1f} ms")
+    if heavy:
+        print(f"[bench]   WARNING heavy modules imported at startup: {', '.join(heavy)}")
+
+
+def cmd_bench(args):
+    import tempfile
+    bench_startup(args.repeat)
+    if args.startup_only:
+        return 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.objects:
+            path = find_workbook(Path(args.data_dir) / name)
+            if path is None:
+                continue
+            module = importlib.import_module(VALIDATORS[name])
+            started = time.perf_counter()
+            state = module.load(path)
+            loaded = time.perf_counter()
+            res = module.run(state, Path(tmp) / name)
+            done = time.perf_counter()
+            rows = len(state["sf_df"]) + len(state["vel_df"])
+            print(f"[bench] {name}: load {loaded - started:.2f}s, validate {done - loaded:.2f}s "
+                  f"({rows / max(done - loaded, 1e-9):,.0f} rows/s) -> {res}")
+    return 0
+
+
+def cmd_cache(args):
+    from src.core import parse_cache
+    if args.action == "clear":
+        n, freed = parse_cache.clear(args.cache_dir)
+        print(f"removed {n} cached sheet(s), {freed / 1e6:.1f} MB")
+    else:
+        files = parse_cache.cache_files(args.cache_dir)
+        size = sum(p.stat().st_size for p in files)
+        print(f"{args.cache_dir}: {len(files)} cached sheet(s), {size / 1e6:.1f} MB")
+    return 0
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog=PROG, description="Velaris <> source data parity checks.")
+    ap.add_argument("--data-dir", default=str(DATA_DIR))
+    ap.add_argument("--output-dir", default=str(OUTPUT_DIR))
+    ap.add_argument("--cache-dir", default=str(CACHE_DIR))
+    ap.add_argument("--mappings-dir", default=str(MAPPINGS_DIR),
+                    help="per-object <object>.json with per-field compare \"rules\" (see core.comparators)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="list objects and their workbooks")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("run", help="validate objects and write reports")
+    p.add_argument("objects", nargs="*", help=f"any of {', '.join(VALIDATORS)} (default: all)")
+    p.add_argument("--path", help="workbook to use instead of the newest one in data/<object>/")
+    p.add_argument("--cache", action="store_true", help="reuse parsed workbooks from --cache-dir")
+    p.add_argument("--xlsx", action="store_true", help="also write report.xlsx (one tab per table)")
+    p.add_argument("--progress", choices=["auto", "bar", "json", "none"], default="auto",
+                   help="live stage progress on stderr: bar, JSON lines, or none (auto: bar on a terminal)")
+    p.add_argument("--sample", type=float, metavar="RATE",
+                   help="compare only a deterministic ID-hash sample (0-1] of matched records and report "
+                        "per-field mismatch rates with 95%% intervals; missing/extra stay exact")
+    p.add_argument("--strata", metavar="COLUMN", help="Salesforce column to stratify the sample by")
+    p.add_argument("--max-per-field", type=int, metavar="N", help="keep at most N mismatch rows per field")
+    p.add_argument("--max-details", type=int, metavar="N", help="keep at most N mismatch rows in total")
+    p.add_argument("--fail-fast", type=float, metavar="RATE",
+                   help="abort when a field mismatches on at least RATE (0-1] of its first --fail-min-rows records")
+    p.add_argument("--fail-min-rows", type=int, default=200, metavar="N")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("watch", help="re-validate whenever data/<object>/ changes")
+    p.add_argument("objects", nargs="*")
+    p.add_argument("--interval", type=float, default=1.0)
+    p.add_argument("--debounce", type=float, default=2.0)
+    p.add_argument("--max-memory-mb", type=float, default=1024)
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("nway", help="compare several source systems against Velaris in one pass")
+    p.add_argument("config", help="JSON run description (see core.nway.load_config)")
+    p.add_argument("--out", help="output folder (default: the config's \"output\")")
+    p.add_argument("--cache", action="store_true", help="reuse parsed workbooks from --cache-dir")
+    p.add_argument("--progress", choices=["auto", "bar", "json", "none"], default="auto",
+                   help="live stage progress on stderr (see run --progress)")
+    p.set_defaults(func=cmd_nway)
+
+    p = sub.add_parser("bench", help="startup and per-object timings")
+    p.add_argument("objects", nargs="*")
+    p.add_argument("--repeat", type=int, default=5, help="startup runs (best is reported)")
+    p.add_argument("--startup-only", action="store_true")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("cache", help="inspect or clear the parsed-workbook cache")
+    p.add_argument("action", choices=["info", "clear"], nargs="?", default="info")
+    p.set_defaults(func=cmd_cache)
+    return ap
+
+
+def main(argv=None):
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if hasattr(args, "objects"):
+        args.objects = pick_objects(ap, args.objects)
+        if getattr(args, "path", None) and len(args.objects) != 1:
+            ap.error("--path needs exactly one object")
+    if getattr(args, "sample", None) is not None and not 0 < args.sample <= 1:
+        ap.error("--sample must be in (0, 1]")
+    if getattr(args, "fail_fast", None) is not None and not 0 < args.fail_fast <= 1:
+        ap.error("--fail-fast must be in (0, 1]")
+    for flag in ("max_per_field", "max_details"):
+        if getattr(args, flag, None) is not None and getattr(args, flag) < 0:
+            ap.error(f"--{flag.replace('_', '-')} must be 0 or more")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
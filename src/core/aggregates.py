@@ -0,0 +1,120 @@
+# aggregates.py
+# Running mismatch aggregates kept while comparing, so per-field breakdowns (summary.json)
+# never need a second pass over mismatch.csv. Memory is bounded regardless of row count.
+import math
+from datetime import date
+
+TOP_K = 10  # value pairs reported per field
+TRACKED = 50  # pairs tracked per field by the heavy-hitters sketch (more slots = tighter counts)
+DELTA_EDGES = [0.01, 0.1, 1, 10, 100, 1000, 10000, 100000]  # |Velaris - SF| bucket upper bounds
+DAY_EDGES = [1, 7, 31, 365]  # |Velaris - SF| in days
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitters: approximate top-k over a stream with a fixed number of counters.
+    Any item seen more than n/capacity times is guaranteed to be tracked; count - error <= true count <= count."""
+
+    def __init__(self, capacity=TRACKED):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+
+    def add(self, item):
+        if item in self.counts:
+            self.counts[item] += 1
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = 1
+            self.errors[item] = 0
+            return
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        self.errors.pop(victim)
+        self.counts[item] = floor + 1
+        self.errors[item] = floor
+
+    def top(self, k=TOP_K):
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [(item, n, self.errors[item]) for item, n in ranked]
+
+
+def bucket_label(value, edges):
+    """Signed bucket for a delta, e.g. '+(1, 10]' or '-(0.01, 0.1]'; exact zero is '0'."""
+    if value == 0:
+        return "0"
+    sign = "+" if value > 0 else "-"
+    mag = abs(value)
+    low = 0
+    for edge in edges:
+        if mag <= edge:
+            return f"{sign}({low:g}, {edge:g}]"
+        low = edge
+    return f"{sign}>{edges[-1]:g}"
+
+
+class MismatchSummary:
+    """Per-field counters fed one failed compare at a time (see engine.validate_frames)."""
+
+    def __init__(self):
+        self.fields = {}
+
+    def field(self, sf_field, vel_field):
+        entry = self.fields.get(sf_field)
+        if entry is None:
+            entry = self.fields[sf_field] = {
+                "velaris_field": vel_field, "mismatches": 0, "by_type": {}, "pairs": SpaceSaving(),
+                "delta_histogram": {}, "delta_stats": None, "day_delta_histogram": {},
+            }
+        return entry
+
+    def add(self, sf_field, vel_field, det, sf_val, vel_val):
+        entry = self.field(sf_field, vel_field)
+        entry["mismatches"] += 1
+        kind = det.get("type", "mismatch")
+        entry["by_type"][kind] = entry["by_type"].get(kind, 0) + 1
+        entry["pairs"].add((str(sf_val), str(vel_val)))
+        if kind == "number":
+            delta = det["vel"] - det["sf"]
+            if math.isfinite(delta):
+                label = bucket_label(delta, DELTA_EDGES)
+                entry["delta_histogram"][label] = entry["delta_histogram"].get(label, 0) + 1
+                stats = entry["delta_stats"]
+                if stats is None:
+                    entry["delta_stats"] = {"min": delta, "max": delta, "sum": delta}
+                else:
+                    stats["min"] = min(stats["min"], delta)
+                    stats["max"] = max(stats["max"], delta)
+                    stats["sum"] += delta
+        elif kind == "date":
+            try:
+                days = (date.fromisoformat(det["vel"]) - date.fromisoformat(det["sf"])).days
+            except (TypeError, ValueError):
+                return
+            label = bucket_label(days, DAY_EDGES)
+            entry["day_delta_histogram"][label] = entry["day_delta_histogram"].get(label, 0) + 1
+
+    def to_dict(self, **totals):
+        fields = {}
+        for name, e in self.fields.items():
+            out = {
+                "velaris_field": e["velaris_field"],
+                "mismatches": e["mismatches"],
+                "by_type": e["by_type"],
+                "top_pairs": [{"sf": sf, "velaris": vel, "count": n, "max_overcount": err}
+                              for (sf, vel), n, err in e["pairs"].top()],
+            }
+            if e["delta_histogram"]:
+                stats = e["delta_stats"]
+                out["delta_histogram"] = e["delta_histogram"]
+                if stats is not None:
+                    n = sum(e["delta_histogram"].values())
+                    out["delta_stats"] = {"min": stats["min"], "max": stats["max"], "mean": stats["sum"] / n}
+            if e["day_delta_histogram"]:
+                out["day_delta_histogram"] = e["day_delta_histogram"]
+            fields[name] = out
+        by_type = {}
+        for e in self.fields.values():
+            for kind, n in e["by_type"].items():
+                by_type[kind] = by_type.get(kind, 0) + n
+        return {**totals, "mismatches": sum(e["mismatches"] for e in self.fields.values()),
+                "by_type": by_type, "fields": fields}
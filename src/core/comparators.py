@@ -0,0 +1,193 @@
+# comparators.py
+# Per-field compare rules. compare_cells applies one global policy a cell at a time; a rule declared for
+# a mapped field is compiled into a kernel that compares the whole column in one go (pandas / numpy), so
+# tolerances, currency amounts, date windows and string policies cost about what plain equality does.
+#
+# A kernel takes two aligned Series of str (SF, Velaris) and returns (ok, kind, sf_shown, vel_shown):
+# a bool array, the mismatch type ("number", "date", ... or an array of them) and the values to report
+# for failed rows. Custom rules register the same way as the built-in ones:
+#
+#     @register("sku")
+#     def sku_rule(prefix=""):
+#         def kernel(sf, vel):
+#             a, b = clean(sf).str.removeprefix(prefix), clean(vel).str.removeprefix(prefix)
+#             return (a == b).to_numpy(), "string", a.to_numpy(), b.to_numpy()
+#         return kernel
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RULES = {}  # rule type -> factory(**params) -> kernel
+
+CURRENCY_SYMBOLS = {"$": "USD", "£": "GBP", "€": "EUR", "¥": "JPY"}
+AMOUNT_PATTERN = r"^([A-Za-z]{3}|[$£€¥])?\s*([-+]?[\d,]*\.?\d+)\s*([A-Za-z]{3})?$"
+YEAR_FIRST_PATTERN = r"^\d{4}[-/.]\d{1,2}[-/.]\d{1,2}(?:$|[T ])"  # ISO and other year-month-day cells
+
+
+def register(name):
+    def deco(factory):
+        RULES[name] = factory
+        return factory
+    return deco
+
+
+def clean(s):
+    return s.fillna("").astype(str).str.strip()
+
+
+def to_number(s):
+    """Cells -> float array, thousands separators dropped; blanks and text become NaN."""
+    return pd.to_numeric(s.str.replace(",", "", regex=False), errors="coerce").to_numpy(dtype=float)
+
+
+def within(a, b, abs_tol, rel_tol):
+    tol = np.maximum(abs_tol, rel_tol * np.maximum(np.abs(a), np.abs(b)))
+    with np.errstate(invalid="ignore"):
+        return np.abs(a - b) <= tol  # NaN on either side -> False
+
+
+def same_text(a, b):
+    # cells neither side could parse still match when the text does (both blank, both "N/A", ...)
+    return (a.str.lower() == b.str.lower()).to_numpy()
+
+
+def to_days(s, dayfirst):
+    """
+    Cells -> UTC timestamps (NaT when not a date); numbers are never dates. Cells starting with the year
+    ("2024-01-02", "2024-01-02T23:30:00Z", "2024/1/2") are always year-month-day, and dayfirst only
+    decides dates such as "01/04/2025" or "01.04.2025". Unlike compare_cells, whose dateutil parse
+    applies dayfirst to every format (so "2025-01-04" reads as 1 April there), ISO dates keep their
+    meaning: an ISO cell against a slash cell can match under one and not under the other.
+    """
+    dated = np.isnan(to_number(s))
+    ymd = s.str.match(YEAR_FIRST_PATTERN).fillna(False).to_numpy(dtype=bool) & dated
+    parts = [pd.to_datetime(s[ymd], errors="coerce", dayfirst=False, format="mixed", utc=True),
+             pd.to_datetime(s[dated & ~ymd], errors="coerce", dayfirst=dayfirst, format="mixed", utc=True)]
+    # one unit for both halves (seconds cover any year a cell can name); numbers stay NaT
+    return pd.concat([p.dt.as_unit("s") for p in parts]).reindex(s.index)
+
+
+@register("exact")
+def exact_rule():
+    """Raw cells equal, no trimming or case folding."""
+    def kernel(sf, vel):
+        a, b = sf.fillna("").astype(str), vel.fillna("").astype(str)
+        return (a == b).to_numpy(), "string", a.to_numpy(), b.to_numpy()
+    return kernel
+
+
+@register("string")
+def string_rule(case_sensitive=False, collapse_whitespace=False):
+    """Trimmed text; optionally case-sensitive and/or with whitespace runs collapsed to one space."""
+    def norm(s):
+        s = clean(s)
+        if collapse_whitespace:
+            s = s.str.replace(r"\s+", " ", regex=True)
+        return s if case_sensitive else s.str.lower()
+
+    def kernel(sf, vel):
+        a, b = norm(sf), norm(vel)
+        return (a == b).to_numpy(), "string", a.to_numpy(), b.to_numpy()
+    return kernel
+
+
+@register("number")
+def number_rule(abs_tol=1e-9, rel_tol=0.0):
+    """|sf - vel| <= max(abs_tol, rel_tol * max(|sf|, |vel|)), e.g. rel_tol 0.005 for ACV rounding."""
+    def kernel(sf, vel):
+        sa, sb = clean(sf), clean(vel)
+        a, b = to_number(sa), to_number(sb)
+        ok = within(a, b, abs_tol, rel_tol) | same_text(sa, sb)
+        numeric = ~np.isnan(a) & ~np.isnan(b)
+        kind = np.where(numeric, "number", "string")
+        return ok, kind, np.where(numeric, a, sa.to_numpy()), np.where(numeric, b, sb.to_numpy())
+    return kernel
+
+
+@register("amount")
+def amount_rule(abs_tol=0.005, rel_tol=0.0, default_currency=None):
+    """
+    Money: "$1,200.00", "USD 1200", "1200 EUR" or a bare number. Amounts compare like "number" (default
+    half a cent); currencies must agree when both sides name one (default_currency fills bare numbers).
+    """
+    def parse(s):
+        parts = s.str.extract(AMOUNT_PATTERN)
+        cur = parts[0].replace(CURRENCY_SYMBOLS).fillna(parts[2]).str.upper()
+        if default_currency:
+            cur = cur.fillna(default_currency.upper())
+        return to_number(parts[1].fillna("")), cur
+
+    def kernel(sf, vel):
+        sa, sb = clean(sf), clean(vel)
+        (a, ca), (b, cb) = parse(sa), parse(sb)
+        amount_ok = within(a, b, abs_tol, rel_tol)
+        currency_ok = (ca.isna() | cb.isna() | (ca == cb)).to_numpy()
+        ok = (amount_ok & currency_ok) | same_text(sa, sb)
+        numeric = ~np.isnan(a) & ~np.isnan(b)
+        kind = np.where(amount_ok, "currency", np.where(numeric, "number", "string"))
+        show_number = numeric & ~amount_ok  # amount deltas feed the summary's numeric histogram
+        return ok, kind, np.where(show_number, a, sa.to_numpy()), np.where(show_number, b, sb.to_numpy())
+    return kernel
+
+
+@register("date")
+def date_rule(window_days=0, dayfirst=True):
+    """
+    Calendar dates (UTC) at most window_days apart, e.g. 1 for timezone drift around midnight. ISO cells
+    are always year-month-day; dayfirst (default True, UK exports) only applies to "01/04/2025" forms.
+    """
+    def parse(s):
+        # each distinct cell is parsed once; exports repeat the same dates a lot
+        uniq = pd.Series(pd.unique(s.to_numpy()), dtype=object)
+        days = to_days(uniq, dayfirst)
+        days = pd.Series(days.dt.tz_localize(None).dt.normalize().to_numpy(), index=uniq.to_numpy())
+        return days.reindex(s.to_numpy()).to_numpy()
+
+    def kernel(sf, vel):
+        sa, sb = clean(sf), clean(vel)
+        a, b = parse(sa), parse(sb)
+        dated = ~np.isnat(a) & ~np.isnat(b)
+        gap = np.abs((a - b).astype("timedelta64[D]").astype(np.int64))
+        ok = (dated & (gap <= window_days)) | same_text(sa, sb)
+        shown_a = np.datetime_as_string(a, unit="D")  # ISO dates, as compare_cells reports them
+        shown_b = np.datetime_as_string(b, unit="D")
+        kind = np.where(dated, "date", "string")
+        return ok, kind, np.where(dated, shown_a, sa.to_numpy()), np.where(dated, shown_b, sb.to_numpy())
+    return kernel
+
+
+def compile_rule(spec):
+    """"date" or {"type": "date", "window_days": 1} -> kernel."""
+    spec = {"type": spec} if isinstance(spec, str) else dict(spec)
+    kind = spec.pop("type", None)
+    if kind not in RULES:
+        raise ValueError(f"unknown compare rule {kind!r} (registered: {', '.join(sorted(RULES))})")
+    try:
+        return RULES[kind](**spec)
+    except TypeError as e:
+        raise ValueError(f"bad options for compare rule {kind!r}: {e}") from None
+
+
+def compile_rules(mapping, rules):
+    """{sf_field: rule spec} -> {sf_field: kernel}; every field must be a mapped SF field."""
+    unknown = [f for f in rules if f not in mapping]
+    if unknown:
+        raise ValueError(f"compare rules for unmapped field(s): {', '.join(unknown)}")
+    compiled = {}
+    for field, spec in rules.items():
+        try:
+            compiled[field] = compile_rule(spec)
+        except ValueError as e:
+            raise ValueError(f"{field}: {e}") from None
+    return compiled
+
+
+def load_rules(path):
+    """The "rules" of a mappings JSON file ({sf_field: spec}); {} when the file is absent or empty."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    text = path.read_text(encoding="utf-8").strip()
+    return json.loads(text).get("rules", {}) if text else {}
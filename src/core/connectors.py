@@ -0,0 +1,203 @@
+# connectors.py
+# Pull records straight from a source API instead of an exported workbook. Pages are fetched
+# concurrently over keep-alive connections (one per worker thread), retried with exponential backoff on
+# 429 / 5xx / dropped connections, and appended column by column, so the engine gets the same DataFrame
+# of str it gets from read_sheets without any per-record dicts being kept around.
+#
+# Paged JSON protocol (core.mock_api serves it for offline runs):
+#   GET <base_url>/<object>?fields=Id,Name&page=1&page_size=2000
+#   -> {"records": [{"Id": ..., "Name": ...}, ...], "page": 1, "total_pages": 12}
+# A response with "next" (a URL or path) instead of "total_pages" is followed page by page (cursor APIs).
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode, urljoin, urlsplit
+
+PAGE_SIZE = 2000
+WORKERS = 4
+RETRIES = 5
+BACKOFF = 0.5  # seconds before the first retry, doubled each time (plus jitter)
+TIMEOUT = 30
+MAX_RETRY_AFTER = 60  # longest Retry-After (seconds) waited for; a server asking for more gets this
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class ConnectorError(RuntimeError):
+    """A page could not be fetched after all retries, or the API answered with something unusable."""
+
+
+class HttpSession:
+    """
+    GET JSON from one host over pooled keep-alive connections. http.client connections are not
+    thread-safe, so each thread gets its own and reuses it for every request it makes.
+    """
+
+    def __init__(self, base_url, token=None, headers=None, timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF,
+                 max_retry_after=MAX_RETRY_AFTER):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL {base_url!r}")
+        self.base_url = base_url.rstrip("/") + "/"
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.headers = {"Accept": "application/json", **(headers or {})}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+        self.pool = None
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = self.local.conn = cls(self.netloc, timeout=self.timeout)
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def reset(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def get_json(self, path, params=None):
+        url = urljoin(self.base_url, path)
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params)
+        target = urlsplit(url)
+        if target.netloc != self.netloc:
+            raise ConnectorError(f"{url}: other host than {self.netloc}")
+        request = target.path + (f"?{target.query}" if target.query else "")
+        problem = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.delay(attempt, problem))
+            try:
+                conn = self.connection()
+                conn.request("GET", request, headers=self.headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                self.reset()  # the server closed the keep-alive connection or the network dropped
+                problem = e
+                continue
+            if resp.status == 200:
+                try:
+                    return json.loads(body)
+                except ValueError as e:
+                    raise ConnectorError(f"GET {url}: response is not JSON ({e})") from None
+            if resp.status not in RETRY_STATUS:
+                raise ConnectorError(f"GET {url}: HTTP {resp.status} {body[:200].decode('utf-8', 'replace')}")
+            problem = resp
+        raise ConnectorError(f"GET {url}: gave up after {self.retries + 1} attempts ({describe(problem)})")
+
+    def delay(self, attempt, problem):
+        retry_after = problem.getheader("Retry-After") if isinstance(problem, http.client.HTTPResponse) else None
+        if retry_after is not None:
+            try:
+                return min(max(float(retry_after), 0.0), self.max_retry_after)
+            except ValueError:
+                pass
+        return self.backoff * 2 ** (attempt - 1) * (1 + random.random() / 2)
+
+    def executor(self, workers):
+        # kept for the session's lifetime: its threads, and so their connections, serve every object
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="fetch")
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
+
+
+def describe(problem):
+    if isinstance(problem, http.client.HTTPResponse):
+        return f"HTTP {problem.status}"
+    return f"{type(problem).__name__}: {problem}"
+
+
+def fetch_pages(session, obj, fields, page_size=PAGE_SIZE, workers=WORKERS):
+    """
+    Record pages of one object, in page order. Page 1 tells how many pages there are; the rest are
+    fetched concurrently, at most 2 x workers ahead of the consumer so memory stays bounded.
+    """
+    obj = quote(obj)  # object / sheet names may hold spaces
+    params = {"fields": ",".join(fields), "page_size": page_size}
+    first = session.get_json(obj, {**params, "page": 1})
+    yield records_of(first)
+    if "total_pages" not in first:
+        nxt = first.get("next")
+        while nxt:
+            page = session.get_json(nxt)
+            yield records_of(page)
+            nxt = page.get("next")
+        return
+    pool = session.executor(workers)
+    todo = iter(range(2, int(first["total_pages"]) + 1))
+    pending = []
+    for n in todo:
+        pending.append(pool.submit(session.get_json, obj, {**params, "page": n}))
+        if len(pending) >= 2 * workers:
+            break
+    try:
+        while pending:
+            page = pending.pop(0).result()
+            n = next(todo, None)
+            if n is not None:
+                pending.append(pool.submit(session.get_json, obj, {**params, "page": n}))
+            yield records_of(page)
+    finally:
+        for f in pending:
+            f.cancel()
+
+
+def records_of(page):
+    records = page.get("records")
+    if not isinstance(records, list):
+        raise ConnectorError(f"page without a \"records\" list: {sorted(page)[:5]}")
+    return records
+
+
+def cell(v):
+    # same strings the workbook path produces: blanks for null, lists joined like exported multi-selects
+    if v is None:
+        return ""
+    if isinstance(v, list):
+        return ", ".join(cell(x) for x in v)
+    return str(v)
+
+
+def fetch_frame(base_url, obj, fields, token=None, page_size=PAGE_SIZE, workers=WORKERS, session=None):
+    """
+    One object as a DataFrame of str with exactly `fields` as columns (only those are requested),
+    ready for engine.validate_frames. Pass a session to reuse its connections across objects.
+    """
+    import pandas as pd
+    fields = list(dict.fromkeys(fields))
+    own = session is None
+    session = session or HttpSession(base_url, token=token)
+    columns = {f: [] for f in fields}
+    try:
+        for records in fetch_pages(session, obj, fields, page_size, workers):
+            for f, col in columns.items():
+                col.extend(cell(r.get(f)) for r in records)
+    finally:
+        if own:
+            session.close()
+    return pd.DataFrame(columns, dtype=object)
@@ -0,0 +1,112 @@
+# delta.py
+# Run-over-run delta: remember a compact hashed index of this run's discrepancies per object and, next
+# run, emit only what is new and what got resolved. Pure hash-set difference, the old CSVs are never read.
+import hashlib
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+from src.core.report_writer import XLSX_REPORT, csv_sink
+
+INDEX_FILE = "delta_index.pkl"
+INDEX_VERSION = 1
+# identity columns per table (by position): what a resolved row still shows once the values are gone
+IDENT_WIDTH = {"mismatch": 2, "missing": 1, "extra": 1}
+OPTIONAL_TABLES = ("counts", "sample")  # only written by capped / sampled runs
+
+
+def row_hash(row):
+    """64-bit hash of a discrepancy: every cell stripped and lowercased, so cosmetic changes don't churn."""
+    raw = "\x1f".join(str(v).strip().lower() for v in row)
+    return int.from_bytes(hashlib.blake2b(raw.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def complete_tables(results):
+    # capped (counts) or sampled runs only hold part of the mismatches: diffing them would report
+    # everything that was merely not emitted as resolved, so their mismatch index is left untouched;
+    # a cancelled run is partial everywhere, so nothing is diffed at all
+    if results.get("summary", {}).get("cancelled"):
+        return []
+    tables = ["missing", "extra"]
+    if "sample" not in results and "counts" not in results:
+        tables.insert(0, "mismatch")
+    return [t for t in tables if t in results]
+
+
+def compute_delta(results, previous):
+    """
+    results: validate_frames output. previous: {table: {hash: identity}} from the last run, or None.
+    Returns (delta tables {"new_<t>": df, "resolved_<t>": df}, index to store for the next run).
+    """
+    index = dict(previous or {})
+    delta = {}
+    for name in complete_tables(results):
+        df = results[name]
+        width = IDENT_WIDTH[name]
+        rows = list(df.itertuples(index=False, name=None))
+        hashes = [row_hash(row) for row in rows]
+        current = {h: tuple(str(v) for v in row[:width]) for h, row in zip(hashes, rows)}
+        old = (previous or {}).get(name, {})
+        fresh = pd.Series([h not in old for h in hashes], index=df.index, dtype=bool)
+        delta[f"new_{name}"] = df[fresh]  # a bool Series keeps the columns even when df is empty
+        gone = [ident for h, ident in old.items() if h not in current]
+        delta[f"resolved_{name}"] = pd.DataFrame(gone, columns=list(df.columns[:width]), dtype=object)
+        index[name] = current
+    return delta, index
+
+
+def load_index(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            data = pickle.load(f)
+    except Exception:
+        return None  # unreadable index: treat as a first run
+    if data.get("version") != INDEX_VERSION:
+        return None
+    return data["tables"]
+
+
+def save_index(path, index):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        pickle.dump({"version": INDEX_VERSION, "tables": index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+
+
+def delta_sink(outdir, headers=None, xlsx=False):
+    """
+    csv_sink that also writes new_<table>.csv / resolved_<table>.csv against the previous run in the
+    same outdir (index kept in <outdir>/delta_index.pkl). On the first run everything is new.
+    Reports this run does not produce (a skipped delta, counts / sample of an earlier capped or
+    sampled run, report.xlsx unless xlsx says this run writes one too) are removed, so whatever is
+    left in outdir belongs to the latest run.
+    """
+    headers = dict(headers or {})
+    for name, cols in list(headers.items()):
+        headers[f"new_{name}"] = cols
+        if name in IDENT_WIDTH:
+            headers[f"resolved_{name}"] = cols[:IDENT_WIDTH[name]]
+    write = csv_sink(outdir, headers)
+
+    def sink(results):
+        index_path = Path(outdir) / INDEX_FILE
+        delta, index = compute_delta(results, load_index(index_path))
+        write({**results, **delta})
+        save_index(index_path, index)
+        remove_stale(outdir, {**results, **delta}, xlsx)
+    return sink
+
+
+def remove_stale(outdir, tables, xlsx=False):
+    stale = [f"{kind}_{name}" for name in IDENT_WIDTH for kind in ("new", "resolved")]
+    for name in [*stale, *OPTIONAL_TABLES]:
+        if name not in tables:
+            (Path(outdir) / f"{name}.csv").unlink(missing_ok=True)
+    if not xlsx:
+        (Path(outdir) / XLSX_REPORT).unlink(missing_ok=True)
@@ -0,0 +1,342 @@
+# engine.py
+# In-memory parity engine: compare frames you already hold, get result tables back.
+# Nothing touches disk unless a sink is passed (see report_writer.csv_sink).
+import numpy as np
+import pandas as pd
+
+from src.core.aggregates import MismatchSummary
+from src.core.comparator import compare_cells
+from src.core.comparators import compile_rules
+from src.core.delta import delta_sink
+from src.core.progress import CHUNK, Cancelled, Progress
+from src.core.report_writer import tee, xlsx_sink
+from src.core.sampling import choose_sample, estimate_rate, format_sample
+
+FAIL_MIN_ROWS = 200  # fail-fast looks at a field only after this many compared records
+
+MISMATCH_COLUMNS = ["ID", "Field", "SF_Value", "Velaris_Value", "Note"]
+EXTRA_COLUMNS = ["Velaris_ID", "Label", "Note"]
+COUNT_COLUMNS = ["Field", "Velaris_Field", "Compared", "Mismatches", "Detail_Rows"]
+SAMPLE_COLUMNS = ["Field", "Matched", "Sampled", "Mismatches", "Rate", "CI_Low", "CI_High", "Est_Mismatches"]
+
+
+class ParityAborted(ValueError):
+    """Raised by the fail-fast check when a field mismatches so often the mapping must be wrong."""
+
+    def __init__(self, summary, field, compared, mismatches):
+        super().__init__(summary)
+        self.field = field
+        self.compared = compared
+        self.mismatches = mismatches
+
+
+def as_frame(table):
+    """
+    A pandas DataFrame is used as-is (no copy); anything with .to_pandas() (pyarrow Table / RecordBatch)
+    is converted, which copies its columns into pandas.
+    """
+    if isinstance(table, pd.DataFrame):
+        return table
+    if hasattr(table, "to_pandas"):
+        return table.to_pandas()
+    raise TypeError(f"expected a DataFrame or Arrow table, got {type(table).__name__}")
+
+
+def column_values(df, col):
+    """Column as a plain list; a column that does not exist reads as all blanks (like row.get(col, ""))."""
+    if col not in df.columns:
+        return [""] * len(df)
+    return df[col].tolist()
+
+
+def build_index(vel_df, vel_id_col):
+    """Lowercased, stripped Velaris ID -> row position (last occurrence wins)."""
+    index = {}
+    for pos, v in enumerate(column_values(vel_df, vel_id_col)):
+        key = str(v).strip()
+        if key:
+            index[key.lower()] = pos
+    return index
+
+
+def blank_rows(df):
+    """Boolean array: True where every cell of the row is blank."""
+    if df.shape[1] == 0:
+        return [True] * len(df)
+    return df.apply(lambda c: c.astype(str).str.strip().eq("")).all(axis=1).tolist()
+
+
+def describe_missing_default(sf_row):
+    return {"Note": "Missing in Velaris"}
+
+
+def mismatch_display(det, vel_val):
+    """(Velaris value to show, note) for a failed compare, same wording the validators always used."""
+    if det.get("type") == "list":
+        return ", ".join(det.get("vel_list", [])), f"Missing items: {', '.join(det['missing'])}"
+    return det.get("vel", vel_val), det.get("type", "mismatch")
+
+
+def cell_failures(compare, sf_col, vel_col, rows, matched_sf, matched_vel, tick=None):
+    """(position in rows, det, sf value, vel value) per failed compare, lazily, so fail-fast stops early.
+    tick(CHUNK) is called after every CHUNK rows (progress / cancellation point)."""
+    seen_pairs = {}  # exports repeat the same values a lot; compare each distinct pair once
+    for t, k in enumerate(rows):
+        if tick is not None and t and t % CHUNK == 0:
+            tick(CHUNK)
+        pair = (sf_col[matched_sf[k]], vel_col[matched_vel[k]])
+        res = seen_pairs.get(pair)
+        if res is None:
+            res = seen_pairs[pair] = compare(*pair)
+        if not res[0]:
+            yield t, res[1], pair[0], pair[1]
+
+
+def kernel_failures(rule, sf_vals, vel_vals):
+    """Same as cell_failures for a compiled rule: the whole column is compared at once."""
+    ok, kind, sf_shown, vel_shown = rule(pd.Series(sf_vals, dtype=object), pd.Series(vel_vals, dtype=object))
+    for t in np.flatnonzero(~ok):
+        det = {"type": kind if isinstance(kind, str) else str(kind[t]), "sf": sf_shown[t], "vel": vel_shown[t]}
+        yield int(t), det, sf_vals[t], vel_vals[t]
+
+
+def find_extras(vel_df, vel_id_col, extra_label, sf_seen, progress, extra_rows):
+    """Append [Velaris ID, label, note] to extra_rows for every Velaris ID not in sf_seen (lowercased)."""
+    vel_ids = column_values(vel_df, vel_id_col)
+    label_col = extra_label if extra_label is not None else (vel_df.columns[0] if len(vel_df.columns) else None)
+    labels = column_values(vel_df, label_col) if label_col is not None else [""] * len(vel_df)
+    progress.stage("extras", len(vel_ids))
+    for n, (vid, label) in enumerate(zip(vel_ids, labels)):
+        if n and n % CHUNK == 0:
+            progress.advance(CHUNK)
+        vid = str(vid).strip()
+        if vid and vid.lower() not in sf_seen:
+            extra_rows.append([vid, label, "Extra in Velaris"])
+    progress.complete()
+    return extra_rows
+
+
+def check_fail_fast(sf_field, vel_field, compared, mismatches, fail_fast, found, f_idx):
+    if mismatches >= fail_fast * compared:
+        raise ParityAborted(abort_summary(sf_field, vel_field, compared, mismatches, fail_fast, found, f_idx),
+                            sf_field, compared, mismatches)
+
+
+def validate_frames(sf_df, vel_df, mapping, sf_id_col, vel_id_col, sink=None, vel_index=None,
+                    blank_is_missing=False, describe_missing=None, extra_label=None, compare=None,
+                    sample=None, strata=None, max_per_field=None, max_details=None, fail_fast=None,
+                    fail_min_rows=FAIL_MIN_ROWS, rules=None, progress=None, summary=None, extras=True,
+                    display=None):
+    """
+    Compare source (Salesforce) rows against target (Velaris) rows joined on the ID columns.
+
+    sf_df / vel_df: DataFrames of string cells, not copied or modified (Arrow tables are converted first).
+    mapping: {sf_field: vel_field}; the ID pair is skipped.
+    sink: optional callable(results), e.g. report_writer.csv_sink(outdir).
+    vel_index: prebuilt build_index(vel_df, vel_id_col), reused by watch mode.
+    blank_is_missing: treat a Velaris row whose cells are all blank as missing.
+    describe_missing: callable(sf_row) -> {column: value} for the missing table (default: a Note).
+    extra_label: Velaris column shown as Label in the extra table (default: first column).
+    compare: cell comparator returning (ok, det), default comparator.compare_cells.
+    sample: fraction (0-1] of matched records to compare, picked by ID hash (see core.sampling);
+            missing/extra stay exact. strata: SF column to stratify the sample by.
+    max_per_field / max_details: stop emitting mismatch detail rows for a field after N of them /
+            overall after N (first N in the usual row order); mismatches are still counted and a
+            "counts" table (per-field compared / mismatches / detail rows) is added.
+    fail_fast: mismatch rate (0-1]; once a field has compared fail_min_rows records (or all of them)
+            at or above this rate, raise ParityAborted instead of grinding through a broken mapping.
+    rules: {sf_field: rule spec} (see core.comparators), e.g. {"ACV": {"type": "number", "rel_tol": 0.005}};
+            those fields are compared column-at-a-time by a compiled kernel instead of by compare.
+    progress: core.progress.Progress for live join / compare / extras / write events. If its cancel
+            token is set, the run stops at the next chunk boundary and the partial tables are still
+            returned (and sent to the sink), with summary["cancelled"] naming the interrupted stage.
+    summary: a core.aggregates.MismatchSummary to add into (chunked runs share one, see core.pipeline).
+    extras: False skips the extra table (left empty), for callers that only see part of the SF side.
+    display: callable(det, vel_val) -> (Velaris value, note) for a mismatch row (default: mismatch_display).
+
+    Returns {"mismatch": df, "missing": df, "extra": df, "summary": dict}, plus "sample" (per-field
+    mismatch rate estimates with 95% intervals) when sampling. In sample mode "mismatch" only covers
+    sampled records. "summary" holds running aggregates (core.aggregates): mismatches per field and
+    type, top SF -> Velaris value pairs and numeric/date delta histograms, counted past any cap.
+    """
+    sf_df = as_frame(sf_df)
+    vel_df = as_frame(vel_df)
+    compare = compare or compare_cells
+    describe_missing = describe_missing or describe_missing_default
+    display = display or mismatch_display
+    progress = progress or Progress()
+    kernels = compile_rules(mapping, rules) if rules else {}
+    if vel_index is None:
+        vel_index = build_index(vel_df, vel_id_col)
+    vel_blank = blank_rows(vel_df) if blank_is_missing else None
+
+    sf_ids = [str(v).strip() for v in column_values(sf_df, sf_id_col)]
+    matched_sf = []
+    matched_vel = []
+    missing_rows = []
+    sf_seen = set()
+    rows = range(0)
+    sample_sizes = None  # (population, sampled) per stratum once the sample is drawn
+    field_hits = {}  # sf_field -> {stratum: mismatching sampled records}
+
+    # detail cap per field: a global cap can never need more than its own size from one field
+    caps = [c for c in (max_per_field, max_details) if c is not None]
+    field_cap = min(caps) if caps else None
+    counts = []
+    summary = summary if summary is not None else MismatchSummary()
+    found = []  # (matched row number, field order, row)
+    extra_rows = []
+    cancelled = None
+    try:
+        # join: SF row position -> Velaris row position
+        progress.stage("join", len(sf_ids))
+        for i, sid in enumerate(sf_ids):
+            if i and i % CHUNK == 0:
+                progress.advance(CHUNK)
+            if not sid:
+                continue
+            key = sid.lower()
+            sf_seen.add(key)
+            j = vel_index.get(key)
+            if j is None or (vel_blank is not None and vel_blank[j]):
+                missing_rows.append({"ID": sid, **describe_missing(sf_df.iloc[i])})
+                continue
+            matched_sf.append(i)
+            matched_vel.append(j)
+        progress.complete()
+
+        # which matched records to compare: all of them, or a deterministic stratified sample
+        rows = range(len(matched_sf))
+        if sample is not None:
+            keys = [sf_ids[i].lower() for i in matched_sf]
+            labels = None
+            if strata is not None:
+                strata_col = column_values(sf_df, strata)
+                labels = [str(strata_col[i]).strip() for i in matched_sf]
+            rows, population, sampled, stratum_of = choose_sample(keys, sample, labels)
+            sample_sizes = (population, sampled)
+        sf_pos = np.asarray(matched_sf, dtype=np.intp)
+        vel_pos = np.asarray(matched_vel, dtype=np.intp)
+
+        # compare one mapped field at a time over the matched rows
+        fields = [(f_idx, sf_field, vel_field) for f_idx, (sf_field, vel_field) in enumerate(mapping.items())
+                  if sf_field.strip().lower() != str(sf_id_col).strip().lower()
+                  and sf_field in sf_df.columns and vel_field in vel_df.columns]
+        progress.stage("compare", len(rows) * len(fields), "cells")
+        for f_idx, sf_field, vel_field in fields:
+            if sample is not None:
+                hits = field_hits[sf_field] = {}
+            rule = kernels.get(sf_field)
+            if rule is not None:
+                picked = np.asarray(rows, dtype=np.intp)
+                failures = kernel_failures(rule, sf_df[sf_field].to_numpy(dtype=object)[sf_pos[picked]],
+                                           vel_df[vel_field].to_numpy(dtype=object)[vel_pos[picked]])
+            else:
+                failures = cell_failures(compare, sf_df[sf_field].tolist(), vel_df[vel_field].tolist(),
+                                         rows, matched_sf, matched_vel, progress.advance)
+            field_start = progress.done
+            compared = len(rows)
+            mismatches = 0
+            emitted = 0
+            check_at = min(fail_min_rows, len(rows)) if fail_fast is not None and rows else None
+            for t, det, sf_val, vel_val in failures:
+                if check_at is not None and t >= check_at:
+                    check_fail_fast(sf_field, vel_field, check_at, mismatches, fail_fast, found, f_idx)
+                    check_at = None
+                k = rows[t]
+                i = matched_sf[k]
+                mismatches += 1
+                summary.add(sf_field, vel_field, det, sf_val, vel_val)
+                if field_cap is None or emitted < field_cap:
+                    vel_display, note = display(det, vel_val)
+                    found.append((k, f_idx, [sf_ids[i], sf_field, sf_val, vel_display, note]))
+                    emitted += 1
+                if sample is not None:
+                    hits[stratum_of[k]] = hits.get(stratum_of[k], 0) + 1
+            if check_at is not None:
+                check_fail_fast(sf_field, vel_field, check_at, mismatches, fail_fast, found, f_idx)
+            counts.append((f_idx, sf_field, vel_field, compared, mismatches))
+            progress.advance(field_start + len(rows) - progress.done)
+        progress.complete()
+
+        if extras:
+            find_extras(vel_df, vel_id_col, extra_label, sf_seen, progress, extra_rows)
+    except Cancelled as e:
+        cancelled = e.stage  # keep what is done so far; the reports below are partial
+    found.sort(key=lambda t: (t[0], t[1]))  # same order as the old row-by-row loop
+    if max_details is not None:
+        del found[max_details:]
+
+    results = {
+        "mismatch": pd.DataFrame([r for _, _, r in found], columns=MISMATCH_COLUMNS, dtype=object),
+        "missing": pd.DataFrame(missing_rows, columns=missing_columns(missing_rows), dtype=object),
+        "extra": pd.DataFrame(extra_rows, columns=EXTRA_COLUMNS, dtype=object),
+    }
+    totals = {"cancelled": cancelled} if cancelled else {}
+    results["summary"] = summary.to_dict(matched=len(matched_sf), compared_records=len(rows), sampled=sample is not None,
+                                         missing=len(missing_rows), extra=len(extra_rows), **totals)
+    if caps:
+        kept = {}
+        for _, f, _ in found:
+            kept[f] = kept.get(f, 0) + 1
+        results["counts"] = pd.DataFrame([[sf_f, vel_f, n, m, kept.get(f, 0)] for f, sf_f, vel_f, n, m in counts],
+                                         columns=COUNT_COLUMNS)
+    if sample_sizes is not None:
+        results["sample"] = sample_table(field_hits, *sample_sizes)
+    if sink is not None:
+        progress.stage("write", len(results), "tables")
+        sink(results)
+        progress.complete()
+    return results
+
+
+def abort_summary(sf_field, vel_field, compared, mismatches, threshold, found, f_idx):
+    examples = [r for _, f, r in found if f == f_idx][:3]
+    lines = [f"aborted: {mismatches}/{compared} ({mismatches / compared:.1%}) of the first compared records "
+             f"mismatch on {sf_field!r} -> {vel_field!r} (fail-fast threshold {threshold:.0%}).",
+             "The mapping or the value format for this field is probably wrong, e.g.:"]
+    for r in examples:
+        lines.append(f"  {r[0]}: SF {r[2]!r} vs Velaris {r[3]!r} ({r[4]})")
+    return "\n".join(lines)
+
+
+def sample_table(field_hits, population, sampled):
+    total = sum(population.values())
+    n = sum(sampled.values())
+    rows = []
+    for field, hits in field_hits.items():
+        rate, low, high = estimate_rate(hits, population, sampled)
+        rows.append([field, total, n, sum(hits.values()), rate, low, high, round(rate * total)])
+    return pd.DataFrame(rows, columns=SAMPLE_COLUMNS)
+
+
+def result_counts(results):
+    """{table name: row count} for the tabular results (what the validators return / print)."""
+    return {name: len(df) for name, df in results.items() if isinstance(df, pd.DataFrame)}
+
+
+def run_object(validate, state, outdir, name, headers=None, xlsx=False, **options):
+    """
+    One validator run writing its reports: validate(state, sink=..., **options) (the object's own
+    validate) feeds the CSVs and their run-over-run delta (core.delta) in outdir, plus report.xlsx
+    with every table as a tab when xlsx. Sampled mismatch rates are printed. Returns result_counts.
+    """
+    sink = delta_sink(outdir, headers, xlsx=xlsx)
+    if xlsx:
+        sink = tee(sink, xlsx_sink(outdir, headers))
+    results = validate(state, sink=sink, **options)
+    if "sample" in results:
+        print(f"[{name}] sampled mismatch rates:")
+        print("\n".join(format_sample(results["sample"])))
+    return result_counts(results)
+
+
+def missing_columns(missing_rows):
+    cols = ["ID"]
+    for row in missing_rows:
+        for c in row:
+            if c not in cols:
+                cols.append(c)
+    if len(cols) == 1:
+        cols.append("Note")
+    return cols
@@ -0,0 +1,154 @@
+# mock_api.py
+# Local stand-in for the Salesforce / Velaris record APIs, speaking the paged JSON protocol of
+# core.connectors, so connector runs (and the N-way "url" sources) work with no network access.
+#   python -m src.core.mock_api data/subscriptions/<workbook>.xlsx --port 8765
+# serves every sheet as /<sheet name> (header row 0, or --header "Sheet name=8").
+# Faults can be injected to exercise retries: every Nth request answers 503, optional latency per page.
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+MAX_PAGE_SIZE = 10000
+
+
+class MockApi(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, tables, host="127.0.0.1", port=0, fail_every=0, latency=0.0, cursor=False, retry_after="0"):
+        """
+        tables: {object name: list of record dicts}. fail_every: answer every Nth request with 503
+        (Retry-After: retry_after). latency: seconds slept per request. cursor: return "next" links
+        instead of "total_pages", like cursor-paged APIs.
+        """
+        super().__init__((host, port), MockApiHandler)
+        self.tables = tables
+        self.fail_every = fail_every
+        self.latency = latency
+        self.cursor = cursor
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failed = 0
+        self.clients = set()  # (host, port) per TCP connection seen, i.e. how well the client pools
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="mock-api", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible in server.clients
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            srv.requests += 1
+            n = srv.requests
+            srv.clients.add(self.client_address)
+        if srv.latency:
+            time.sleep(srv.latency)
+        if srv.fail_every and n % srv.fail_every == 0:
+            with srv.lock:
+                srv.failed += 1
+            return self.reply(503, {"error": "injected failure"}, {"Retry-After": srv.retry_after})
+
+        url = urlsplit(self.path)
+        name = unquote(url.path.strip("/"))
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        records = srv.tables.get(name)
+        if records is None:
+            return self.reply(404, {"error": f"unknown object {name!r}", "objects": sorted(srv.tables)})
+        try:
+            page = int(query.get("page", 1))
+            size = min(int(query.get("page_size", 2000)), MAX_PAGE_SIZE)
+        except ValueError:
+            return self.reply(400, {"error": "page and page_size must be integers"})
+        if page < 1 or size < 1:
+            return self.reply(400, {"error": "page and page_size must be positive"})
+        fields = [f for f in query.get("fields", "").split(",") if f]
+        known = records[0].keys() if records else ()
+        unknown = [f for f in fields if f not in known]
+        if records and unknown:
+            return self.reply(400, {"error": f"unknown field(s): {', '.join(unknown)}"})
+
+        chunk = records[(page - 1) * size:page * size]
+        if fields:
+            chunk = [{f: r.get(f) for f in fields} for r in chunk]
+        total_pages = max(1, -(-len(records) // size))
+        body = {"records": chunk, "page": page}
+        if srv.cursor:
+            if page < total_pages:
+                body["next"] = f"{url.path}?{urlencode({**query, 'page': page + 1})}"
+        else:
+            body["total_pages"] = total_pages
+        self.reply(200, body)
+
+    def reply(self, status, body, headers=None):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # quiet: tests and benchmarks fire thousands of requests
+
+
+def frame_records(df):
+    """DataFrame -> record dicts, blanks as null like the real APIs send them."""
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict("records")
+
+
+def workbook_tables(path, headers=None):
+    from src.core.sheet_loader import read_sheets
+    return {name: frame_records(df) for name, df in read_sheets(path, headers=headers).items()}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="mock_api", description="Serve workbook sheets over the connector protocol.")
+    ap.add_argument("workbook")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--header", action="append", default=[], metavar="SHEET=ROW",
+                    help="header row of a sheet (default 0), repeatable")
+    ap.add_argument("--fail-every", type=int, default=0, metavar="N")
+    ap.add_argument("--latency", type=float, default=0.0, metavar="SECONDS")
+    ap.add_argument("--cursor", action="store_true", help="cursor paging (\"next\") instead of page numbers")
+    args = ap.parse_args(argv)
+    headers = {}
+    for item in args.header:
+        sheet, _, row = item.rpartition("=")
+        if not sheet or not row.isdigit():
+            ap.error(f"--header expects SHEET=ROW, got {item!r}")
+        headers[sheet] = int(row)
+    server = MockApi(workbook_tables(args.workbook, headers), args.host, args.port,
+                     args.fail_every, args.latency, args.cursor)
+    for name, records in server.tables.items():
+        print(f"{server.url}/{name}  ({len(records)} records)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
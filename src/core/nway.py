@@ -0,0 +1,190 @@
+# nway.py
+# N-way parity: index Velaris once, join any number of source systems (Salesforce, HubSpot, Stripe...)
+# against it in a single pass each, and report per record which systems agree, disagree or lack it.
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.core.aggregates import MismatchSummary
+from src.core.comparator import compare_cells
+from src.core.comparators import compile_rules
+from src.core.engine import as_frame, build_index, cell_failures, column_values, kernel_failures, mismatch_display
+from src.core.progress import CHUNK, Cancelled, Progress
+from src.core.sheet_loader import read_sheets
+
+NWAY_MISMATCH_COLUMNS = ["System", "ID", "Field", "Velaris_Field", "Source_Value", "Velaris_Value", "Note"]
+
+# per-record status of a system
+AGREE = "agree"  # every mapped field matches Velaris
+DISAGREE = "disagree"  # at least one mapped field differs
+ABSENT = "absent"  # the system does not have the record
+PRESENT = "present"  # the system has it but Velaris does not, nothing to compare against
+
+
+def validate_nway(vel_df, vel_id_col, sources, sink=None, vel_index=None, compare=None, progress=None):
+    """
+    vel_df / vel_id_col: the Velaris side, indexed once (or pass vel_index).
+    sources: {system: {"df": frame, "id_col": column, "mapping": {source_field: velaris_field},
+              "rules": {source_field: rule spec} (optional, see core.comparators)}}.
+    Fields are compared as engine.validate_frames compares them: by compare (default
+    comparator.compare_cells), or column-at-a-time by the compiled kernel of a field with a rule.
+    progress: core.progress.Progress for the per-system join / compare stages ("join <system>", ...);
+    once its cancel token is set the run stops at the next chunk and the partial tables are returned
+    (and sent to the sink) with summary["cancelled"] naming the stage.
+    Returns {"records": df, "mismatch": df, "summary": dict}:
+      records  - one row per ID seen anywhere: Velaris presence, one status column per system
+                 (agree / disagree / absent / present) and how many systems agree / disagree / lack it.
+      mismatch - every differing field, tagged with the system.
+      summary  - per-system totals plus core.aggregates field breakdowns.
+    Cost is one pass over each source plus one over Velaris, however many systems there are.
+    """
+    vel_df = as_frame(vel_df)
+    compare = compare or compare_cells
+    progress = progress or Progress()
+    if vel_index is None:
+        vel_index = build_index(vel_df, vel_id_col)
+    systems = list(sources)
+    kernels = {name: compile_rules(spec["mapping"], spec["rules"]) if spec.get("rules") else {}
+               for name, spec in sources.items()}
+
+    # status[system][velaris position]; IDs only some source has are collected separately
+    status = {name: [ABSENT] * len(vel_df) for name in systems}
+    source_only = {}  # lowercased id -> (display id, {system: PRESENT})
+    found = []
+    system_totals = {name: {"rows": 0, "matched": 0, "not_in_velaris": 0} for name in systems}
+    summaries = {name: MismatchSummary() for name in systems}
+    cancelled = None
+
+    try:
+        for name in systems:
+            spec = sources[name]
+            df = as_frame(spec["df"])
+            id_col = spec["id_col"]
+            ids = [str(v).strip() for v in column_values(df, id_col)]
+
+            progress.stage(f"join {name}", len(ids))
+            matched_src = []
+            matched_vel = []
+            for i, sid in enumerate(ids):
+                if i and i % CHUNK == 0:
+                    progress.advance(CHUNK)
+                if not sid:
+                    continue
+                j = vel_index.get(sid.lower())
+                if j is None:
+                    entry = source_only.setdefault(sid.lower(), (sid, {}))
+                    entry[1][name] = PRESENT
+                    continue
+                matched_src.append(i)
+                matched_vel.append(j)
+                status[name][j] = AGREE
+            progress.complete()
+            system_totals[name] = {"rows": len(df), "matched": len(matched_src),
+                                   "not_in_velaris": sum(1 for _, s in source_only.values() if name in s)}
+
+            rows = range(len(matched_src))
+            src_pos = np.asarray(matched_src, dtype=np.intp)
+            vel_pos = np.asarray(matched_vel, dtype=np.intp)
+            fields = [(f_idx, src_field, vel_field)
+                      for f_idx, (src_field, vel_field) in enumerate(spec["mapping"].items())
+                      if src_field.strip().lower() != str(id_col).strip().lower()
+                      and src_field in df.columns and vel_field in vel_df.columns]
+            progress.stage(f"compare {name}", len(rows) * len(fields), "cells")
+            for f_idx, src_field, vel_field in fields:
+                rule = kernels[name].get(src_field)
+                if rule is not None:
+                    failures = kernel_failures(rule, df[src_field].to_numpy(dtype=object)[src_pos],
+                                               vel_df[vel_field].to_numpy(dtype=object)[vel_pos])
+                else:
+                    failures = cell_failures(compare, df[src_field].tolist(), vel_df[vel_field].tolist(),
+                                             rows, matched_src, matched_vel, progress.advance)
+                field_start = progress.done
+                for k, det, src_val, vel_val in failures:
+                    status[name][matched_vel[k]] = DISAGREE
+                    summaries[name].add(src_field, vel_field, det, src_val, vel_val)
+                    vel_display, note = mismatch_display(det, vel_val)
+                    found.append((name, k, f_idx,
+                                  [name, ids[matched_src[k]], src_field, vel_field, src_val, vel_display, note]))
+                progress.advance(field_start + len(rows) - progress.done)
+            progress.complete()
+    except Cancelled as e:
+        cancelled = e.stage  # systems not reached yet stay "absent"; the reports below are partial
+    found.sort(key=lambda t: (systems.index(t[0]), t[1], t[2]))
+
+    # one pass over Velaris (+ IDs only sources have) for the per-record matrix
+    records = []
+    for j, vid in enumerate(column_values(vel_df, vel_id_col)):
+        vid = str(vid).strip()
+        if not vid or vel_index.get(vid.lower()) != j:
+            continue  # blank or duplicate Velaris ID (the index keeps the last one)
+        records.append(record_row(vid, "present", [status[n][j] for n in systems]))
+    for sid, present in source_only.values():
+        records.append(record_row(sid, ABSENT, [present.get(n, ABSENT) for n in systems]))
+
+    velaris_rows = [r for r in records if r[1] == "present"]
+    for idx, name in enumerate(systems):
+        col = [r[2 + idx] for r in velaris_rows]
+        system_totals[name].update({"agree": col.count(AGREE), "disagree": col.count(DISAGREE),
+                                    "absent": col.count(ABSENT)})
+
+    results = {
+        "records": pd.DataFrame(records, columns=["ID", "Velaris", *systems,
+                                                  "Systems_Agree", "Systems_Disagree", "Systems_Absent"]),
+        "mismatch": pd.DataFrame([r for *_, r in found], columns=NWAY_MISMATCH_COLUMNS, dtype=object),
+        "summary": {"velaris_records": len(velaris_rows),
+                    "systems": {n: {**system_totals[n], **summaries[n].to_dict()} for n in systems}},
+    }
+    if cancelled:
+        results["summary"]["cancelled"] = cancelled
+    if sink is not None:
+        sink(results)
+    return results
+
+
+def record_row(rid, velaris, statuses):
+    return [rid, velaris, *statuses, statuses.count(AGREE), statuses.count(DISAGREE), statuses.count(ABSENT)]
+
+
+def load_config(path):
+    """
+    Read an N-way run description (JSON):
+      {"velaris": {"path": "...xlsx", "sheet": "Velaris", "id": "Booking", "header": 0},
+       "sources": {"salesforce": {"path": "...", "sheet": "Salesforce", "id": "Booking: Booking ID",
+                                  "header": 8, "mapping": {"Email": "Booking Email", ...},
+                                  "rules": {"Amount": {"type": "number", "rel_tol": 0.005}}},
+                   "hubspot": {...}},
+       "output": "output/nway"}
+    A system can be pulled from its API instead of a workbook (see core.connectors):
+      {"url": "https://api.example.com/v1", "object": "Account", "id": "Id", "token": "...", "mapping": ...}
+    Only the ID and mapped fields are requested (for Velaris: every field some source maps to).
+    Relative paths are taken from the config file's folder. Each workbook is parsed once even if
+    several systems live in it. Returns (vel_df, vel_id_col, sources, output dir).
+    """
+    path = Path(path)
+    cfg = json.loads(path.read_text(encoding="utf-8"))
+    specs = {"velaris": cfg["velaris"], **cfg["sources"]}
+
+    # parse each workbook once, with every header row any of its sheets needs
+    wanted = {}
+    for spec in specs.values():
+        if "url" in spec:
+            continue
+        book = path.parent / spec["path"]
+        wanted.setdefault(book, {})[spec["sheet"]] = spec.get("header", 0)
+    books = {book: read_sheets(book, names=list(headers), headers=headers) for book, headers in wanted.items()}
+    vel_fields = [f for spec in cfg["sources"].values() for f in spec.get("mapping", {}).values()]
+
+    def frame(spec, fields):
+        if "url" in spec:
+            from src.core.connectors import fetch_frame
+            return fetch_frame(spec["url"], spec["object"], [spec["id"], *fields], token=spec.get("token"),
+                               **{k: spec[k] for k in ("page_size", "workers") if k in spec})
+        return books[path.parent / spec["path"]][spec["sheet"]].fillna("").astype(str)
+
+    vel = cfg["velaris"]
+    sources = {name: {"df": frame(spec, spec.get("mapping", {})), "id_col": spec["id"],
+                      "mapping": spec.get("mapping", {}), "rules": spec.get("rules", {})}
+               for name, spec in cfg["sources"].items()}
+    return frame(vel, vel_fields), vel["id"], sources, Path(cfg.get("output", "output/nway"))
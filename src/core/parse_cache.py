@@ -0,0 +1,82 @@
+# parse_cache.py
+# Optional on-disk cache of parsed workbooks: parsing xlsx dominates a run, unpickling frames is ~instant.
+# Disabled until enable() is called (the CLI does it for `run --cache`). keep_warm() adds an in-memory
+# layer for long-lived processes (watch mode). sheet_loader keys sheets by content, so a refreshed
+# workbook only re-parses the sheets that changed.
+import hashlib
+import pickle
+from pathlib import Path
+
+CACHE_DIR = None  # Path once enabled
+MEMORY = None  # warm_state.WarmCache once keep_warm() is called
+
+
+def enable(cache_dir):
+    global CACHE_DIR
+    CACHE_DIR = Path(cache_dir)
+
+
+def keep_warm(max_bytes):
+    """Also keep parsed values in this process, up to max_bytes (least recently used dropped first)."""
+    global MEMORY
+    from src.core.warm_state import WarmCache
+    MEMORY = WarmCache(max_bytes)
+    return MEMORY
+
+
+def enabled():
+    return CACHE_DIR is not None or MEMORY is not None
+
+
+def content_key(options):
+    """Cache key for a value that depends only on options (e.g. a sheet's content signature)."""
+    return hashlib.sha1(repr(sorted(options.items())).encode("utf-8")).hexdigest()
+
+
+def lookup(key):
+    """Cached value for key (memory first, then disk), or None."""
+    if MEMORY is not None:
+        data = MEMORY.get(key)
+        if data is not None:
+            return data
+    if CACHE_DIR is None:
+        return None
+    entry = CACHE_DIR / f"{key}.pkl"
+    if not entry.exists():
+        return None
+    try:
+        with entry.open("rb") as f:
+            data = pickle.load(f)
+    except Exception:
+        entry.unlink(missing_ok=True)  # truncated / stale pickle, re-parse
+        return None
+    if MEMORY is not None:
+        MEMORY.put(key, data)
+    return data
+
+
+def store(key, data):
+    if MEMORY is not None:
+        MEMORY.put(key, data)
+    if CACHE_DIR is None:
+        return
+    entry = CACHE_DIR / f"{key}.pkl"
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = entry.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(entry)
+
+
+def cache_files(cache_dir):
+    cache_dir = Path(cache_dir)
+    return sorted(cache_dir.glob("*.pkl")) if cache_dir.is_dir() else []
+
+
+def clear(cache_dir):
+    """Delete every cached entry; returns (files removed, bytes freed)."""
+    files = cache_files(cache_dir)
+    freed = sum(p.stat().st_size for p in files)
+    for p in files:
+        p.unlink()
+    return len(files), freed
@@ -0,0 +1,281 @@
+# pipeline.py
+# Staged runs instead of parse-everything, compare-everything, write-everything. A reader thread streams
+# the Salesforce sheet in chunks, the calling thread compares each chunk as soon as it arrives, and a
+# writer thread appends the result batches to the CSVs. Bounded queues sit between the stages, so a fast
+# stage waits for the slow one instead of buffering the whole sheet, and wall time tends to the slowest
+# stage rather than the sum. prefetch() also parses the next workbook in a background process meanwhile.
+import csv
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.core.aggregates import MismatchSummary
+from src.core.engine import COUNT_COLUMNS, EXTRA_COLUMNS, build_index, column_values, find_extras, validate_frames
+from src.core.progress import Cancelled, Progress
+from src.core.report_writer import write_json
+from src.core.sheet_loader import open_workbook, rows_frame, sheet_rows
+
+CHUNK_ROWS = 5000  # Salesforce rows per chunk
+QUEUE_SIZE = 4  # chunks / result batches in flight between two stages
+DONE = object()
+
+
+# ---------------- reader: one sheet, chunk by chunk ----------------
+def iter_sheet_chunks(path, sheet, header=0, chunk_rows=CHUNK_ROWS):
+    """
+    Stream one sheet as DataFrames of str (blanks as ""), chunk_rows rows at a time, with the same
+    header handling and cell strings as pd.read_excel(path, sheet, header=header, dtype=str).
+    Only the open chunk is in memory (openpyxl read-only mode). Columns are fixed by the first chunk:
+    a later row wider than every row before it loses its extra cells, which could only ever have
+    landed in unnamed columns.
+    """
+    wb = open_workbook(path)
+    columns = None
+    try:
+        batch = []
+        for row in sheet_rows(wb[sheet]):
+            batch.append(row)
+            if len(batch) >= chunk_rows + (header + 1 if columns is None else 0):
+                df = rows_frame(batch, header) if columns is None else rows_frame(batch, None, columns)
+                columns = list(df.columns)
+                yield df.fillna("").astype(str)
+                batch = []
+        if batch:
+            df = rows_frame(batch, header) if columns is None else rows_frame(batch, None, columns)
+            yield df.fillna("").astype(str)
+    finally:
+        wb.close()
+
+
+def background(items, maxsize=QUEUE_SIZE):
+    """
+    Run an iterator in a thread, handing its items over through a bounded queue (read-ahead).
+    When the consumer stops early (error, cancel, break) the reader thread stops too, and a generator
+    is closed from that thread, so e.g. iter_sheet_chunks releases its workbook.
+    """
+    q = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        # never blocks for good on a full queue: gives up once the consumer is gone
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(DONE)
+        except BaseException as e:
+            put(e)
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    threading.Thread(target=produce, name="reader", daemon=True).start()
+    try:
+        while True:
+            item = q.get()
+            if item is DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()  # consumer gave up (error, cancel): let the reader thread finish
+
+
+# ---------------- writer thread ----------------
+class ReportWriter:
+    """
+    Appends result batches to <outdir>/<name>.csv from a writer thread, fed through a bounded queue.
+    A table's CSV is opened with the columns of its first non-empty batch (or headers[name]); later
+    batches are aligned to them. close() flushes, joins and re-raises any write error.
+    """
+
+    def __init__(self, outdir, headers=None, maxsize=QUEUE_SIZE):
+        self.outdir = Path(outdir)
+        self.headers = headers or {}
+        self.queue = queue.Queue(maxsize)
+        self.files = {}  # name -> (file, csv writer, columns)
+        self.pending = {}  # name -> columns of empty batches seen before any rows
+        self.error = None
+        self.thread = threading.Thread(target=self.loop, name="writer", daemon=True)
+        self.thread.start()
+
+    def append(self, name, df):
+        self.raise_error()
+        self.queue.put((name, df))
+
+    def write_json(self, name, data):
+        self.raise_error()
+        self.queue.put((name, data))
+
+    def close(self):
+        self.queue.put(DONE)
+        self.thread.join()
+        self.raise_error()
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def loop(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is DONE:
+                    break
+                name, data = item
+                if isinstance(data, dict):
+                    write_json(self.outdir / f"{name}.json", data)
+                else:
+                    self.write_rows(name, data)
+            for name, columns in self.pending.items():
+                if name not in self.files:
+                    self.open(name, columns)
+        except BaseException as e:
+            self.error = e
+            while self.queue.get() is not DONE:  # drain so producers never block on a dead writer
+                pass
+        finally:
+            for f, _, _ in self.files.values():
+                f.close()
+
+    def open(self, name, columns):
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        f = (self.outdir / f"{name}.csv").open("w", newline="", encoding="utf-8")
+        w = csv.writer(f)
+        w.writerow(self.headers.get(name) or columns)
+        self.files[name] = (f, w, columns)
+        return self.files[name]
+
+    def write_rows(self, name, df):
+        if name not in self.files:
+            if df.empty:
+                self.pending[name] = list(df.columns)
+                return
+            self.open(name, list(df.columns))
+        _, w, columns = self.files[name]
+        if list(df.columns) != columns:
+            df = df.reindex(columns=columns, fill_value="")
+        w.writerows(df.itertuples(index=False, name=None))
+
+
+# ---------------- comparer ----------------
+def validate_stream(chunks, vel_df, mapping, sf_id_col, vel_id_col, outdir=None, headers=None, vel_index=None,
+                    extra_label=None, max_per_field=None, max_details=None, fail_fast=None, progress=None,
+                    **options):
+    """
+    engine.validate_frames over a stream of Salesforce chunks (e.g. background(iter_sheet_chunks(...)))
+    against one in-memory Velaris frame. Each chunk's mismatch / missing rows go to a ReportWriter on
+    <outdir> as soon as it is compared, in the order validate_frames would list them for the whole sheet;
+    extra.csv, counts.csv (when capped) and summary.json follow at the end. Caps apply across chunks;
+    fail_fast judges the first chunk. Other options (blank_is_missing, describe_missing, compare, rules,
+    fail_min_rows) go to validate_frames; sample needs every record up front and is not supported.
+    progress: cancellation is checked between chunks; a cancelled run still writes what it has.
+    Returns {"mismatch": n, "missing": n, "extra": n, "summary": dict}: only counts stay in memory.
+    """
+    if options.get("sample") is not None:
+        raise ValueError("validate_stream cannot sample; use engine.validate_frames for sampled runs")
+    progress = progress or Progress()
+    if vel_index is None:
+        vel_index = build_index(vel_df, vel_id_col)
+    caps = [c for c in (max_per_field, max_details) if c is not None]
+    field_cap = min(caps) if caps else None
+    writer = ReportWriter(outdir, headers) if outdir is not None else None
+    summary = MismatchSummary()
+    sf_seen = set()
+    totals = {"mismatch": 0, "missing": 0, "matched": 0}
+    counts = {}  # sf_field -> [vel_field, compared, mismatches]
+    emitted = {}  # sf_field -> detail rows written
+    extra_rows = []
+    cancelled = None
+    try:
+        progress.stage("stream")
+        for n, chunk in enumerate(chunks):
+            res = validate_frames(chunk, vel_df, mapping, sf_id_col, vel_id_col, vel_index=vel_index,
+                                  extra_label=extra_label, max_per_field=field_cap, max_details=max_details,
+                                  fail_fast=fail_fast if n == 0 else None, summary=summary, extras=False,
+                                  **options)
+            sf_seen.update(v.lower() for v in (str(v).strip() for v in column_values(chunk, sf_id_col)) if v)
+            mismatch = res["mismatch"]
+            if caps:
+                for sf_field, vel_field, compared, mismatches, _ in res["counts"].itertuples(index=False, name=None):
+                    entry = counts.setdefault(sf_field, [vel_field, 0, 0])
+                    entry[1] += compared
+                    entry[2] += mismatches
+                mismatch = capped(mismatch, emitted, max_per_field, None if max_details is None
+                                  else max_details - totals["mismatch"])
+            totals["mismatch"] += len(mismatch)
+            totals["missing"] += len(res["missing"])
+            totals["matched"] += res["summary"]["matched"]
+            if writer is not None:
+                writer.append("mismatch", mismatch)
+                writer.append("missing", res["missing"])
+            progress.advance(len(chunk))
+        progress.complete()
+        find_extras(vel_df, vel_id_col, extra_label, sf_seen, progress, extra_rows)
+    except Cancelled as e:
+        cancelled = e.stage  # what was compared so far is still written below
+    except BaseException:
+        if writer is not None:
+            writer.close()  # e.g. ParityAborted: flush what is there, then let it propagate
+        raise
+
+    extra = pd.DataFrame(extra_rows, columns=EXTRA_COLUMNS, dtype=object)
+    state = {"cancelled": cancelled} if cancelled else {}
+    result = summary.to_dict(matched=totals["matched"], compared_records=totals["matched"], sampled=False,
+                             missing=totals["missing"], extra=len(extra_rows), **state)
+    if writer is not None:
+        progress.stage("write", None, "tables")
+        writer.append("extra", extra)
+        writer.write_json("summary", result)
+        if caps:
+            writer.append("counts", pd.DataFrame([[f, vel_f, c, m, emitted.get(f, 0)]
+                                                  for f, (vel_f, c, m) in counts.items()], columns=COUNT_COLUMNS))
+        writer.close()
+        progress.complete()
+    return {"mismatch": totals["mismatch"], "missing": totals["missing"], "extra": len(extra_rows),
+            "summary": result}
+
+
+def capped(mismatch, emitted, max_per_field, left):
+    """Rows of one chunk's mismatch table the caps still allow (left: overall budget, None = no cap)."""
+    keep = []
+    for pos, field in enumerate(mismatch["Field"]):
+        if left is not None and len(keep) >= left:
+            break
+        if max_per_field is not None and emitted.get(field, 0) >= max_per_field:
+            continue
+        keep.append(pos)
+        emitted[field] = emitted.get(field, 0) + 1
+    return mismatch.iloc[keep]
+
+
+# ---------------- prefetch: next workbook while this one runs ----------------
+def prefetch(items, load):
+    """
+    Yield (item, future of load(item)) in order; load of the next item is already running in a
+    background process while the caller works on the current one. load must be picklable (a
+    module-level function). Call future.result() to get the value or the loader's exception.
+    """
+    items = list(items)
+    if not items:
+        return
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        current = pool.submit(load, items[0])
+        for pos, item in enumerate(items):
+            nxt = pool.submit(load, items[pos + 1]) if pos + 1 < len(items) else None
+            yield item, current
+            current = nxt
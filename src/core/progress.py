@@ -0,0 +1,135 @@
+# progress.py
+# Live feedback for long runs. Each stage (load, join, compare, extras, write) reports how far it got;
+# Progress turns that into throughput and ETA events for a renderer (terminal bar or JSON lines) and
+# checks a cancellation token at every chunk boundary, so a run can stop cleanly with partial reports.
+import json
+import signal
+import sys
+import threading
+import time
+
+CHUNK = 10000  # records between progress ticks / cancellation checks
+INTERVAL = 0.5  # seconds between rendered updates of one stage
+
+
+class Cancelled(Exception):
+    """Raised at a chunk boundary once the run's CancelToken was set."""
+
+    def __init__(self, stage):
+        super().__init__(f"cancelled during {stage}")
+        self.stage = stage
+
+
+class CancelToken:
+    """Set from anywhere (signal handler, another thread, an orchestrator hook); checked between chunks."""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+
+class Progress:
+    """
+    Stage-by-stage counters. render: callable(event dict) or None (counting only, no output).
+    Events: {"event": "start" | "progress" | "done", "object", "stage", "done", "total", "unit",
+    "rate" (units/s), "eta" (seconds, when the total is known), "elapsed"}.
+    """
+
+    def __init__(self, render=None, token=None, label="", interval=INTERVAL):
+        self.render = render
+        self.token = token
+        self.label = label
+        self.interval = interval
+        self.name = None
+
+    def stage(self, name, total=None, unit="rows"):
+        self.name = name
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.started = self.last = time.perf_counter()
+        self.emit("start")
+
+    def advance(self, n):
+        self.done += n
+        if self.render is not None:
+            now = time.perf_counter()
+            if now - self.last >= self.interval:
+                self.last = now
+                self.emit("progress")
+        self.check()
+
+    def complete(self, done=None):
+        """End the stage: everything (or `done`) done; no cancellation check, so partial reports still get written."""
+        if done is not None:
+            self.done = done
+        elif self.total is not None:
+            self.done = self.total
+        self.emit("done")
+
+    def check(self):
+        if self.token is not None and self.token.cancelled:
+            raise Cancelled(self.name)
+
+    def emit(self, kind):
+        if self.render is None:
+            return
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(self.total - self.done, 0) / rate
+        self.render({"event": kind, "object": self.label, "stage": self.name, "done": self.done,
+                     "total": self.total, "unit": self.unit, "rate": round(rate, 1),
+                     "eta": None if eta is None else round(eta, 1), "elapsed": round(elapsed, 3)})
+
+
+def json_lines(stream=None):
+    """Renderer: one JSON object per event, for orchestrators."""
+    def render(event):
+        out = stream or sys.stderr
+        out.write(json.dumps(event) + "\n")
+        out.flush()
+    return render
+
+
+def progress_bar(stream=None, width=24):
+    """Renderer: a one-line bar per stage, redrawn in place; only finished stages when not a terminal."""
+    def render(event):
+        out = stream or sys.stderr
+        tty = out.isatty()
+        if not tty and event["event"] != "done":
+            return
+        total = event["total"]
+        if total:
+            frac = min(event["done"] / total, 1.0)
+            bar = "#" * int(frac * width) + "-" * (width - int(frac * width))
+            count = f"[{bar}] {frac:4.0%} {event['done']:,}/{total:,}"
+        else:
+            count = f"{event['done']:,}"
+        line = f"[{event['object']}] {event['stage']:<8} {count} {event['unit']} {event['rate']:,.0f}/s"
+        if event["event"] == "done":
+            line += f" in {event['elapsed']:.1f}s"
+        elif event["eta"] is not None:
+            line += f" ETA {event['eta']:.0f}s"
+        if tty:
+            out.write("\r\x1b[K" + line + ("\n" if event["event"] == "done" else ""))
+        else:
+            out.write(line + "\n")
+        out.flush()
+    return render
+
+
+def cancel_on_sigint(token):
+    """First Ctrl-C cancels at the next chunk boundary (partial reports are written); a second one aborts."""
+    def handler(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        token.cancel()
+        sys.stderr.write("\ncancelling at the next chunk boundary (Ctrl-C again to abort)\n")
+    return signal.signal(signal.SIGINT, handler)
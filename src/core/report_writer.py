@@ -1,7 +1,11 @@
 # report_writer.py
 import csv
+import json
 from pathlib import Path
 
+EXCEL_MAX_ROWS = 1048576  # rows per worksheet, header included
+XLSX_REPORT = "report.xlsx"  # run --xlsx workbook, next to the CSVs
+
 def write_csv(path, rows, header):
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -10,3 +14,110 @@ def write_csv(path, rows, header):
         w.writerow(header)
         for r in rows:
             w.writerow(r)
+
+def write_xlsx(path, tables, headers=None, max_rows=EXCEL_MAX_ROWS):
+    """Stream result tables into one workbook, one tab each (openpyxl write-only mode, so rows go
+    straight to disk instead of building the whole sheet in memory).
+    tables: {name: DataFrame or dict}; dicts (the summary) become a totals + per-field tab.
+    Tables longer than an Excel sheet continue on "<name> (2)", "<name> (3)", ...
+    SF / Velaris value columns of the mismatch tab are highlighted."""
+    from openpyxl import Workbook
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    headers = headers or {}
+    wb = Workbook(write_only=True)
+    styles = xlsx_styles(wb)
+    for name, table in tables.items():
+        if isinstance(table, dict):
+            write_sheet(wb, name, summary_rows(table), ["Item", "Value"], styles, {}, max_rows)
+        else:
+            header = headers.get(name) or list(table.columns)
+            marks = {2: "sf_value", 3: "vel_value"} if name == "mismatch" else {}
+            write_sheet(wb, name, table.itertuples(index=False, name=None), header, styles, marks, max_rows)
+    wb.save(path)
+
+def xlsx_styles(wb):
+    # registered once per workbook; cells then only carry the style name
+    from openpyxl.styles import Font, NamedStyle, PatternFill
+    styles = {
+        "header": NamedStyle("header", font=Font(bold=True, color="FFFFFF"),
+                             fill=PatternFill("solid", fgColor="305496")),
+        "sf_value": NamedStyle("sf_value", fill=PatternFill("solid", fgColor="FCE4D6")),
+        "vel_value": NamedStyle("vel_value", fill=PatternFill("solid", fgColor="E2EFDA")),
+    }
+    for style in styles.values():
+        wb.add_named_style(style)
+    return styles
+
+def write_sheet(wb, name, rows, header, styles, marks, max_rows):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    def new_sheet(part):
+        ws = wb.create_sheet(name[:31] if part == 1 else f"{name[:25]} ({part})")
+        ws.freeze_panes = "A2"
+        ws.append([styled(ws, h, "header") for h in header])
+        return ws
+    def styled(ws, value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    def clean(v):
+        return ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v
+    part = 1
+    ws = new_sheet(part)
+    used = 1
+    for r in rows:
+        if used == max_rows:
+            part += 1
+            ws = new_sheet(part)
+            used = 1
+        ws.append([styled(ws, clean(v), marks[i]) if i in marks else clean(v) for i, v in enumerate(r)])
+        used += 1
+
+def summary_rows(summary):
+    """Flatten summary.json: scalar totals first, then one line per field."""
+    for key, value in summary.items():
+        if not isinstance(value, (dict, list)):
+            yield [key, value]
+    for kind, n in summary.get("by_type", {}).items():
+        yield [f"mismatches ({kind})", n]
+    for field, entry in summary.get("fields", {}).items():
+        types = ", ".join(f"{k}: {n}" for k, n in entry.get("by_type", {}).items())
+        top = entry.get("top_pairs")
+        note = f"; top: {top[0]['sf']!r} -> {top[0]['velaris']!r} x{top[0]['count']}" if top else ""
+        yield [f"{field} -> {entry.get('velaris_field', '')}", f"{entry.get('mismatches', 0)} ({types}){note}"]
+
+def write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=str)
+
+def write_frame_csv(path, df, header=None):
+    write_csv(path, df.itertuples(index=False, name=None), header or list(df.columns))
+
+def csv_sink(outdir, headers=None):
+    """Sink for engine.validate_frames: writes <outdir>/<name>.csv for each result table
+    (and <name>.json for dict results such as the summary).
+    headers: optional {name: [column titles]} to override the table's own column names."""
+    headers = headers or {}
+    def sink(results):
+        for name, df in results.items():
+            if isinstance(df, dict):
+                write_json(Path(outdir) / f"{name}.json", df)
+            else:
+                write_frame_csv(Path(outdir) / f"{name}.csv", df, headers.get(name))
+    return sink
+
+def xlsx_sink(outdir, headers=None, filename=XLSX_REPORT):
+    """Sink for engine.validate_frames: the result tables as tabs of a single <outdir>/report.xlsx."""
+    def sink(results):
+        write_xlsx(Path(outdir) / filename, results, headers)
+    return sink
+
+def tee(*sinks):
+    """One sink feeding several (e.g. the CSVs and the workbook)."""
+    def sink(results):
+        for s in sinks:
+            s(results)
+    return sink
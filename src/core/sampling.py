@@ -0,0 +1,87 @@
+# sampling.py
+# Deterministic, stratified sampling of matched records for quick parity estimates.
+# A record is picked when hash(ID) falls under the rate, so the same IDs are sampled on every run
+# and on every machine (no RNG state), and reruns are comparable.
+import hashlib
+import math
+
+Z_95 = 1.959964
+MIN_PER_STRATUM = 30  # small strata are topped up (or taken whole) so each gets a usable estimate
+
+
+def id_unit(key):
+    """Map an ID to a stable float in [0, 1)."""
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def choose_sample(keys, rate, strata=None, min_per_stratum=MIN_PER_STRATUM):
+    """
+    keys: lowercased IDs of the matched records; strata: parallel list of stratum labels (or None).
+    Returns (picked positions sorted, {stratum: population size}, {stratum: sample size}, stratum per position).
+    """
+    groups = {}
+    for k, key in enumerate(keys):
+        h = strata[k] if strata is not None else ""
+        groups.setdefault(h, []).append((id_unit(key), k))
+    picked = []
+    population = {}
+    sampled = {}
+    for h, members in groups.items():
+        members.sort()
+        n = sum(1 for u, _ in members if u < rate)
+        n = max(n, min(min_per_stratum, len(members)))
+        picked.extend(k for _, k in members[:n])
+        population[h] = len(members)
+        sampled[h] = n
+    stratum_of = strata if strata is not None else [""] * len(keys)
+    return sorted(picked), population, sampled, stratum_of
+
+
+def wilson_interval(p, n, z=Z_95):
+    if n <= 0:
+        return 0.0, 1.0
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def estimate_rate(mismatches, population, sampled):
+    """
+    Stratified mismatch-rate estimate for one field.
+    mismatches: {stratum: mismatching sampled records}. Returns (rate, ci_low, ci_high).
+    The interval is Wilson's on the effective sample size, with finite-population correction,
+    so fields with zero sampled mismatches still get an honest upper bound.
+    """
+    total = sum(population.values())
+    if total == 0:
+        return 0.0, 0.0, 0.0
+    rate = 0.0
+    var = 0.0
+    for h, n_h in sampled.items():
+        if n_h == 0:
+            continue
+        w = population[h] / total
+        p_h = mismatches.get(h, 0) / n_h
+        rate += w * p_h
+        fpc = 1 - n_h / population[h]
+        var += w * w * fpc * p_h * (1 - p_h) / max(n_h - 1, 1)
+    n = sum(sampled.values())
+    if var > 0 and 0 < rate < 1:
+        n_eff = rate * (1 - rate) / var
+    else:
+        n_eff = n / max(1 - n / total, 1e-9)  # everything or nothing mismatched: FPC-inflated sample size
+    if n >= total:
+        return rate, rate, rate  # census, nothing to estimate
+    low, high = wilson_interval(rate, n_eff)
+    return rate, low, high
+
+
+def format_sample(table):
+    """Terminal lines for engine.validate_frames(..., sample=...)["sample"]."""
+    lines = []
+    for r in table.itertuples(index=False):
+        lines.append(f"  {r.Field:<30} {r.Rate:7.2%}  95% CI [{r.CI_Low:.2%}, {r.CI_High:.2%}]  "
+                     f"({r.Mismatches}/{r.Sampled} sampled, ~{r.Est_Mismatches} of {r.Matched})")
+    return lines
@@ -0,0 +1,250 @@
+# sheet_loader.py
+# Parse the sheets of one workbook concurrently: each worker process opens the workbook read-only
+# (openpyxl read_only mode only materialises the sheet it is asked for) and sends back one parsed
+# frame. With one core, or a single sheet, everything is parsed from a single open instead.
+# Rows are read the way pd.read_excel(dtype=str) reads them, with a progress tick every TICK_ROWS rows
+# (from the workers too, through a queue), so a long parse reports rows/s and can be cancelled.
+import multiprocessing
+import os
+import queue
+import re
+import signal
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.etree import ElementTree
+
+from src.core import parse_cache
+from src.core.progress import Cancelled
+
+PARALLEL_MIN_BYTES = 1024 * 1024  # below this, process start-up costs more than it saves
+TICK_ROWS = 1000  # rows between load progress ticks / cancellation checks (wide sheets parse slowly)
+
+REPORT = None  # in a worker process: (row count queue, stop event), set by init_worker
+
+
+def sheet_names(path):
+    """Sheet names in workbook order, read straight from xl/workbook.xml (no shared-strings load)."""
+    with zipfile.ZipFile(path) as z:
+        root = ElementTree.fromstring(z.read("xl/workbook.xml"))
+    return [el.get("name") for el in root.iter() if el.tag.endswith("}sheet") or el.tag == "sheet"]
+
+
+def sheet_members(z):
+    """{sheet name: its XML part in the zip}, in workbook order."""
+    root = ElementTree.fromstring(z.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    targets = {el.get("Id"): el.get("Target") for el in rels}
+    members = {}
+    for el in root.iter():
+        if el.tag.endswith("}sheet") or el.tag == "sheet":
+            rid = next(v for k, v in el.attrib.items() if k.endswith("}id"))
+            target = targets[rid]
+            members[el.get("name")] = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return members
+
+
+def sheet_signatures(path):
+    """
+    {sheet name: what its parse depends on}: CRC + size of the sheet XML and of the shared strings,
+    styles and workbook parts, straight from the zip directory (nothing is decompressed). Equal
+    signatures mean an equal parse, whatever the file's name or mtime.
+    """
+    with zipfile.ZipFile(path) as z:
+        info = {i.filename: (i.CRC, i.file_size) for i in z.infolist()}
+        members = sheet_members(z)
+    common = tuple(info.get(m) for m in ("xl/workbook.xml", "xl/sharedStrings.xml", "xl/styles.xml"))
+    return {name: (info.get(member), common) for name, member in members.items()}
+
+
+def row_count(path, names=None):
+    """
+    Rows the sheets declare in their <dimension> (header and blank rows included), the total a load
+    stage counts up to; None when a sheet does not declare one. Only the start of each sheet is read.
+    """
+    total = 0
+    with zipfile.ZipFile(path) as z:
+        for name, member in sheet_members(z).items():
+            if names is not None and name not in names:
+                continue
+            with z.open(member) as f:
+                head = f.read(4096).decode("utf-8", "replace")
+            m = re.search(r'<(?:\w+:)?dimension ref="[A-Z]+\d+(?::[A-Z]+(\d+))?"', head)
+            if m is None:
+                return None
+            total += int(m.group(1) or 1)
+    return total
+
+
+def usable_cpus():
+    # cpu_count() reports the host, not what this process (container, taskset) may use
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def cell_value(cell):
+    # pandas' own openpyxl conversion, so frames hold exactly what read_excel(dtype=str) would
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+    v = cell.value
+    if v is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float("nan")
+    if cell.data_type == TYPE_NUMERIC:
+        i = int(v)
+        return i if i == v else float(v)
+    return v
+
+
+def sheet_rows(ws):
+    """Rows of a read-only worksheet as read_excel sees them: trailing blank cells and rows dropped."""
+    ws.reset_dimensions()
+    blanks = []  # held back until a row with data follows them
+    for row in ws.rows:
+        values = [cell_value(c) for c in row]
+        while values and values[-1] == "":
+            values.pop()
+        if not values:
+            blanks.append(values)
+            continue
+        yield from blanks
+        blanks = []
+        yield values
+
+
+def rows_frame(rows, header=0, names=None):
+    """Rows -> DataFrame of str (NaN for blanks), padded to one width and parsed as read_excel does."""
+    import pandas as pd
+    from pandas.errors import EmptyDataError
+    from pandas.io.parsers import TextParser
+    if not rows:
+        return pd.DataFrame()
+    width = len(names) if names is not None else max(len(r) for r in rows)
+    rows = [r[:width] + [""] * (width - len(r)) for r in rows]
+    try:
+        return TextParser(rows, header=header, names=names, dtype=str, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+def parse_sheet(wb, name, header=0, tick=None):
+    """One sheet of an open read-only workbook; tick(rows) every TICK_ROWS rows and at the end."""
+    rows = []
+    for row in sheet_rows(wb[name]):
+        rows.append(row)
+        if tick is not None and len(rows) % TICK_ROWS == 0:
+            tick(TICK_ROWS)
+    if tick is not None and len(rows) % TICK_ROWS:
+        tick(len(rows) % TICK_ROWS)
+    return rows_frame(rows, header)
+
+
+def open_workbook(path):
+    from openpyxl import load_workbook
+    return load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+
+def init_worker(counts, stop):
+    global REPORT
+    REPORT = (counts, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is the parent's to handle: it sets stop
+    # open_workbook (shared strings) can take seconds without a tick: leave as soon as stop is set
+    # instead, so the parent does not wait for that at exit. The parent reads nothing more from us then.
+    threading.Thread(target=exit_on_stop, args=(stop,), daemon=True).start()
+
+
+def exit_on_stop(stop):
+    stop.wait()
+    os._exit(1)
+
+
+def check_stop():
+    if REPORT is not None and REPORT[1].is_set():
+        raise Cancelled("load")
+
+
+def report_rows(n):
+    check_stop()
+    REPORT[0].put(n)
+
+
+def parse_one(path, name, header):
+    """Worker: parse a single sheet as strings (same result as pd.read_excel(..., dtype=str))."""
+    check_stop()
+    wb = open_workbook(path)  # shared strings are loaded here, the longest stretch without a tick
+    try:
+        check_stop()
+        return parse_sheet(wb, name, header, report_rows if REPORT is not None else None)
+    finally:
+        wb.close()
+
+
+def parse_serial(path, names, headers, tick=None):
+    wb = open_workbook(path)
+    try:
+        return {n: parse_sheet(wb, n, headers.get(n, 0), tick) for n in names}
+    finally:
+        wb.close()
+
+
+def read_sheets(path, names=None, headers=None, workers=None, progress=None):
+    """
+    Parse sheets of an .xlsx into {sheet name: DataFrame of str (NaN for blanks)}, in workbook order,
+    like pd.read_excel(path, sheet_name=None, dtype=str) but concurrent.
+    names: sheets to parse (default: all). headers: {sheet name: header row}, default row 0.
+    workers: max processes (default: one per sheet, capped at the CPU count).
+    progress: core.progress.Progress whose current stage (the caller's "load") is advanced by the rows
+    parsed; a set cancel token raises Cancelled within TICK_ROWS rows of any sheet.
+    With parse_cache enabled (run --cache, watch mode) each sheet is cached under its content signature,
+    so only sheets that changed since the last parse are parsed again. Cached frames are shared: copy
+    before modifying one in place.
+    """
+    headers = dict(headers or {})
+    if not parse_cache.enabled():
+        return parse_sheets(path, names, headers, workers, progress)
+    signatures = sheet_signatures(path)
+    names = list(names) if names is not None else list(signatures)
+    keys = {n: parse_cache.content_key({"loader": "sheet", "content": signatures[n], "header": headers.get(n, 0)})
+            for n in names}
+    sheets = {n: parse_cache.lookup(keys[n]) for n in names}
+    changed = [n for n, df in sheets.items() if df is None]
+    if changed:
+        for n, df in parse_sheets(path, changed, headers, workers, progress).items():
+            parse_cache.store(keys[n], df)
+            sheets[n] = df
+    return sheets
+
+
+def parse_sheets(path, names, headers, workers, progress=None):
+    names = list(names) if names is not None else sheet_names(path)
+    workers = min(workers or usable_cpus(), len(names))
+    if workers <= 1 or Path(path).stat().st_size < PARALLEL_MIN_BYTES:
+        return parse_serial(path, names, headers, progress.advance if progress is not None else None)
+    if progress is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {n: pool.submit(parse_one, str(path), n, headers.get(n, 0)) for n in names}
+            return {n: f.result() for n, f in futures.items()}
+    counts = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(counts, stop))
+    try:
+        futures = {n: pool.submit(parse_one, str(path), n, headers.get(n, 0)) for n in names}
+        while not all(f.done() for f in futures.values()):
+            try:
+                progress.advance(counts.get(timeout=0.1))
+            except queue.Empty:
+                progress.check()
+    except BaseException:  # Cancelled, or a second Ctrl-C
+        # queued sheets are dropped; workers still opening the workbook see stop right after it
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    while True:
+        try:
+            progress.advance(counts.get_nowait())
+        except queue.Empty:
+            break
+    return {n: f.result() for n, f in futures.items()}
@@ -0,0 +1,47 @@
+# warm_state.py
+# Parsed sheets kept in memory between runs (used by watch mode through parse_cache.keep_warm). Entries are
+# keyed by sheet content (see sheet_loader.read_sheets), so a refreshed workbook only re-parses the sheets
+# that actually changed; the rest come back from here without touching openpyxl.
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def value_nbytes(value):
+    """Rough in-memory size of a cached value (a parsed sheet, or a dict / list of them)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(value_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(value_nbytes(v) for v in value)
+    return 0
+
+
+class WarmCache:
+    """LRU store of parsed values bounded by a memory ceiling (in bytes)."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, nbytes)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        self.entries.pop(key, None)
+        nbytes = value_nbytes(value)
+        if nbytes > self.max_bytes:
+            # too big to keep warm on its own; next change pays a cold parse
+            return False
+        self.entries[key] = (value, nbytes)
+        while self.total_bytes() > self.max_bytes:
+            self.entries.popitem(last=False)
+        return True
+
+    def total_bytes(self):
+        return sum(n for _, n in self.entries.values())
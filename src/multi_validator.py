@@ -7,18 +7,25 @@ Requirements:
 """
 
 import pandas as pd
-import json, csv, re, os
+import json, csv, re, os, itertools, sys
 from pathlib import Path
 from dateutil import parser as date_parser
 
+if not __package__:  # run as a script (python src/multi_validator.py): make the `src` package importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core.engine import validate_frames
+from src.core.pipeline import CHUNK_ROWS, background, iter_sheet_chunks, prefetch, validate_stream
+from src.core.report_writer import csv_sink
+from src.core.sheet_loader import read_sheets, sheet_names, usable_cpus
+
 # === CONFIG (uses your uploaded files) ===
 EXCEL_FILES = [
     "/mnt/data/Corporate Subscriptions to Velaris _ Salesforce.xlsx",
     "/mnt/data/Salesforce to Velaris Opportunity _ Uberall.xlsx",
     "/mnt/data/SF Custom Object - Bookings to Velaris Custom Object _ DataIQ.xlsx"
 ]
-OUTPUT_DIR = Path("../output")
-OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
+OUTPUT_DIR = Path("../output")  # created on first write, not at import
 
 # Heuristic tokens used to auto-detect ID columns
 ID_TOKENS = [
@@ -30,7 +37,7 @@ ID_TOKENS = [
 # ---------------- Utility functions ----------------
 def read_excel_sheets(path):
     """Return dict of sheet_name -> DataFrame (string dtype, NaNs -> empty strings)"""
-    x = pd.read_excel(path, sheet_name=None, dtype=str, engine="openpyxl")
+    x = read_sheets(path)  # parsed concurrently, one worker per sheet
     return {k: df.fillna("").astype(str) for k, df in x.items()}
 
 
@@ -189,8 +196,18 @@ def write_csv(p, rows, header):
             w.writerow(r)
 
 
+def detect_id_columns(mapping, sf_df, vel_df):
+    """(SF ID column, Velaris ID column): a mapped SafeID / external ID pair, else by header heuristics."""
+    for s, t in mapping.items():
+        if s.strip().lower() in ("msafeid__c", "msafeid", "safeid", "external id", "externalid"):
+            return s, t
+    return candidate_id_column(sf_df), candidate_id_column(vel_df)
+
+
 # ---------------- Core: validate one workbook ----------------
-def validate_workbook(path):
+def validate_workbook(path, write=True, progress=None):
+    """Validate one workbook; write=False skips the CSV reports (results are still returned).
+    progress: optional core.progress.Progress for live join / compare / write events and cancellation."""
     path = Path(path)
     sheets = read_excel_sheets(path)
     mapping = to_unified_mapping(sheets)
@@ -219,75 +236,68 @@ def validate_workbook(path):
     if not mapping:
         mapping = {col: col for col in sf_df.columns if col in vel_df.columns}
 
-    # detect id cols
-    sf_id_col = None;
-    vel_id_col = None
-    for s, t in mapping.items():
-        if s.strip().lower() in ("msafeid__c", "msafeid", "safeid", "external id", "externalid"):
-            sf_id_col = s;
-            vel_id_col = t;
-            break
-    sf_id_col = sf_id_col or candidate_id_column(sf_df)
-    vel_id_col = vel_id_col or candidate_id_column(vel_df)
-
-    # create velaris lookup
-    vel_map = {}
-    for _, row in vel_df.iterrows():
-        key = str(row.get(vel_id_col, "")).strip()
-        if key:
-            vel_map[key.lower()] = row
-
-    mismatch_rows = [];
-    missing_rows = [];
-    sf_seen = set()
-    for _, sf_row in sf_df.iterrows():
-        sid = str(sf_row.get(sf_id_col, "")).strip()
-        if not sid: continue
-        sf_seen.add(sid.lower())
-        vrow = vel_map.get(sid.lower())
-        if vrow is None:
-            missing_rows.append([sid, "Missing in Velaris"])
-            continue
-        # compare mapped fields
-        for sf_field, vel_field in mapping.items():
-            if sf_field.strip().lower() == sf_id_col.strip().lower(): continue
-            if sf_field not in sf_df.columns or vel_field not in vel_df.columns: continue
-            sf_val = sf_row.get(sf_field, "")
-            vel_val = vrow.get(vel_field, "")
-            ok, det = compare_cells(sf_val, vel_val)
-            if not ok:
-                if det.get("type") == "list":
-                    note = f"Missing items: {', '.join(det['missing'])}"
-                    vel_display = ", ".join(det.get("vel_list", []))
-                else:
-                    note = det.get("type", "mismatch")
-                    vel_display = det.get("vel", vel_val)
-                mismatch_rows.append([sid, sf_field, sf_val, vel_display, note])
-
-    extra_rows = []
-    for _, vrow in vel_df.iterrows():
-        vid = str(vrow.get(vel_id_col, "")).strip()
-        if not vid: continue
-        if vid.lower() not in sf_seen:
-            label = vel_df.columns[0]
-            extra_rows.append([vid, vrow.get(label, ""), "Extra in Velaris"])
-
-    # write outputs
+    sf_id_col, vel_id_col = detect_id_columns(mapping, sf_df, vel_df)
+
+    # join + compare in memory (same engine the validators use, with this module's compare_cells)
     base = OUTPUT_DIR / path.stem.replace(" ", "_")
-    write_csv(base / "mismatch.csv", mismatch_rows, ["ID", "Field", "SF_Value", "Velaris_Value", "Note"])
-    write_csv(base / "missing.csv", missing_rows, ["ID", "Note"])
-    write_csv(base / "extra.csv", extra_rows, ["Velaris_ID", "Label", "Note"])
+    results = validate_frames(sf_df, vel_df, mapping, sf_id_col, vel_id_col,
+                              sink=csv_sink(base) if write else None, compare=compare_cells, progress=progress)
+    mismatch_rows, missing_rows, extra_rows = results["mismatch"], results["missing"], results["extra"]
     print(
         f"[OK] {path.name} -> output/{path.stem}/ (mismatch:{len(mismatch_rows)} missing:{len(missing_rows)} extra:{len(extra_rows)})")
-    return {"file": str(path), "mismatch": len(mismatch_rows), "missing": len(missing_rows), "extra": len(extra_rows)}
+    return {"file": str(path), "mismatch": len(mismatch_rows), "missing": len(missing_rows), "extra": len(extra_rows),
+            "results": results}
+
+
+# ---------------- Pipelined: stream the Salesforce sheet, prefetch the next workbook ----------------
+def prepare_workbook(path):
+    """Everything validate_workbook needs except the Salesforce rows: the mapping and the Velaris sheet.
+    Runs in a background process (core.pipeline.prefetch) while the previous workbook is compared.
+    None when the data sheets are not named "...Salesforce..." / "...Velaris..." (use validate_workbook)."""
+    path = Path(path)
+    names = sheet_names(path)
+    sf_name = next((n for n in names if "salesforce" in n.lower()), None)
+    vel_name = next((n for n in names if "velaris" in n.lower()), None)
+    if sf_name is None or vel_name is None or sf_name == vel_name:
+        return None
+    sheets = read_sheets(path, names=[n for n in names if n != sf_name])
+    sheets = {k: df.fillna("").astype(str) for k, df in sheets.items()}
+    return {"sf_sheet": sf_name, "vel_df": sheets[vel_name], "mapping": to_unified_mapping(sheets)}
+
+
+def stream_workbook(path, prepared, progress=None, chunk_rows=CHUNK_ROWS):
+    """validate_workbook with the Salesforce sheet read, compared and written chunk by chunk
+    (see core.pipeline). prepared: prepare_workbook(path). Returns counts only, no result tables."""
+    path = Path(path)
+    vel_df, mapping = prepared["vel_df"], prepared["mapping"]
+    chunks = background(iter_sheet_chunks(path, prepared["sf_sheet"], chunk_rows=chunk_rows))
+    first = next(chunks, None)
+    sf_head = first if first is not None else pd.DataFrame()
+    if not mapping:
+        mapping = {col: col for col in sf_head.columns if col in vel_df.columns}
+    sf_id_col, vel_id_col = detect_id_columns(mapping, sf_head, vel_df)
+    base = OUTPUT_DIR / path.stem.replace(" ", "_")
+    counts = validate_stream(itertools.chain([first] if first is not None else [], chunks), vel_df, mapping,
+                             sf_id_col, vel_id_col, outdir=base, compare=compare_cells, progress=progress)
+    print(
+        f"[OK] {path.name} -> output/{path.stem}/ (mismatch:{counts['mismatch']} missing:{counts['missing']} extra:{counts['extra']})")
+    return {"file": str(path), **counts}
 
 
 # --------------- main ----------------
 def main():
     results = []
-    for f in EXCEL_FILES:
+    # With a spare core the next workbook is parsed in the background while this one is compared, and the
+    # Salesforce sheet is streamed (core.pipeline). On one core nothing can overlap, and streaming would
+    # only open each workbook twice, so the plain sequential run is kept there.
+    if usable_cpus() > 1:
+        runs = prefetch(EXCEL_FILES, prepare_workbook)
+    else:
+        runs = ((f, None) for f in EXCEL_FILES)
+    for f, prepared in runs:
         try:
-            res = validate_workbook(f)
+            prepared = prepared.result() if prepared is not None else None
+            res = stream_workbook(f, prepared) if prepared else validate_workbook(f)
             results.append(res)
         except Exception as e:
             print("[ERROR] processing", f, ":", e)
@@ -0,0 +1,28 @@
+# Kept import-light (stdlib only): the CLI lists objects and finds workbooks without loading pandas.
+from pathlib import Path
+
+# object name -> validator module (imported on demand). Each exposes load(path, progress=None) -> state,
+# where progress is a core.progress.Progress advanced while the workbook is parsed (and checked for
+# cancellation), validate(state, sink=None, **options) and run(state, outdir, xlsx=False, **options)
+# (core.engine.run_object).
+VALIDATORS = {
+    "bookings": "src.validators.bookings_validator",
+    "opportunities": "src.validators.opportunities_validator",
+    "subscriptions": "src.validators.subscriptions_validator",
+}
+
+
+def is_workbook(path):
+    """An .xlsx a validator can read (not an Excel '~$' lock file)."""
+    return path.suffix == ".xlsx" and not path.name.startswith("~$")
+
+
+def find_workbook(folder):
+    """Newest .xlsx in folder (ignoring Excel '~$' lock files), or None."""
+    folder = Path(folder)
+    if not folder.is_dir():
+        return None
+    books = [p for p in folder.glob("*.xlsx") if is_workbook(p)]
+    if not books:
+        return None
+    return max(books, key=lambda p: p.stat().st_mtime)
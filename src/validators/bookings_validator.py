@@ -1,8 +1,8 @@
 # bookings_validator.py
-import pandas as pd
+import sys
 from pathlib import Path
-from core.comparator import compare_cells
-from core.report_writer import write_csv
+from src.core.engine import build_index, run_object, validate_frames
+from src.core.sheet_loader import read_sheets, sheet_names
 
 
 # ---------------------------------------------------
@@ -14,15 +14,24 @@ EXCEL_PATH = "C:\\Users\\acer\Desktop\\Velaris_Project\\Hackathon\\UniversalData
 SF_ID_COL = "Booking: Booking ID"
 VEL_ID_COL = "Booking"
 
+OUTPUT_DIR = Path("output/bookings")
+HEADERS = {
+    "mismatch": ["Booking ID", "Field", "SF Value", "Velaris Value", "Note"],
+    "missing": ["Booking ID", "Note"],
+    "extra": ["Velaris Booking ID", "Label", "Note"],
+}
+
 
 # ---------------------------------------------------
 # LOAD SHEETS WITH CORRECT HEADER
 # Salesforce header is at row 9 (zero-index = 8)
 # Velaris & Mapping headers are normal
 # ---------------------------------------------------
-def load_sheets(path):
+def load_sheets(path, progress=None):
 
-    all_sheets = pd.read_excel(path, sheet_name=None, dtype=str, engine="openpyxl")
+    # one parse per sheet (in parallel when possible), Salesforce already with its header row
+    headers = {name: 8 for name in sheet_names(path) if "salesforce" in name.lower()}
+    all_sheets = read_sheets(path, headers=headers, progress=progress)
 
     sf_sheet = None
     vel_sheet = None
@@ -33,10 +42,7 @@ def load_sheets(path):
 
         # Salesforce sheet → header row manually applied
         if "salesforce" in name_low:
-            sf_sheet = pd.read_excel(
-                path, sheet_name=name, dtype=str, engine="openpyxl", header=8
-            )
-            sf_sheet = sf_sheet.fillna("").astype(str)
+            sf_sheet = df.fillna("").astype(str)
 
         # Velaris sheet
         elif "velaris" in name_low:
@@ -71,13 +77,11 @@ def build_mapping_default():
 
 
 # ---------------------------------------------------
-# VALIDATOR MAIN LOGIC
+# LOAD: parse workbook + build Velaris lookup map
 # ---------------------------------------------------
-def main():
-
-    print("[bookings] loading", EXCEL_PATH)
+def load(path=EXCEL_PATH, progress=None):
 
-    sf_df, vel_df, mapping_df = load_sheets(EXCEL_PATH)
+    sf_df, vel_df, mapping_df = load_sheets(path, progress)
 
     # Mapping logic
     if mapping_df is not None:
@@ -85,89 +89,55 @@ def main():
     else:
         mapping = build_mapping_default()
 
+    return {
+        "sf_df": sf_df,
+        "vel_df": vel_df,
+        "mapping": mapping,
+        "sf_id_col": SF_ID_COL,
+        "vel_id_col": VEL_ID_COL,
+        "vel_index": build_index(vel_df, VEL_ID_COL),
+    }
+
+
+# ---------------------------------------------------
+# VALIDATOR MAIN LOGIC (in memory, see core.engine)
+# ---------------------------------------------------
+def raw_display(det, vel_val):
+    # bookings reports show the Velaris cell as it is and the compare type as note (list mismatches too)
+    return vel_val, det.get("type", "mismatch")
+
+
+def validate(state, sink=None, **options):
+
+    return validate_frames(
+        state["sf_df"], state["vel_df"], state["mapping"], SF_ID_COL, VEL_ID_COL,
+        sink=sink, vel_index=state["vel_index"], extra_label=VEL_ID_COL, display=raw_display,
+        **options,
+    )
+
+
+# ---------------------------------------------------
+# WRITE REPORTS
+# ---------------------------------------------------
+def run(state, outdir=OUTPUT_DIR, xlsx=False, **options):
+
     print(f"[bookings] SF ID: {SF_ID_COL}, Velaris ID: {VEL_ID_COL}")
 
-    # ---------------------------------------------------
-    # Build Velaris lookup map
-    # ---------------------------------------------------
-    vel_map = {}
-    for _, row in vel_df.iterrows():
-        key = str(row.get(VEL_ID_COL, "")).strip()
-        if key:
-            vel_map[key.lower()] = row
-
-    mismatch = []
-    missing = []
-    seen_ids = set()
-
-    # ---------------------------------------------------
-    # Compare row by row
-    # ---------------------------------------------------
-    for _, row in sf_df.iterrows():
-        try:
-          sid = str(row.get(SF_ID_COL, "")).strip()
-        except IndexError:
-            continue
-
-        if not sid:
-            continue
-
-        seen_ids.add(sid.lower())
-
-        vel_row = vel_map.get(sid.lower())
-        if vel_row is None:
-            missing.append([sid, "Missing in Velaris"])
-            continue
-
-        # Compare mapped fields
-        for sf_field, vel_field in mapping.items():
-            if sf_field == SF_ID_COL:
-                continue
-
-            if sf_field not in sf_df.columns or vel_field not in vel_df.columns:
-                continue
-
-            sf_val = row.get(sf_field, "")
-            vel_val = vel_row.get(vel_field, "")
-
-            ok, info = compare_cells(sf_val, vel_val)
-            if not ok:
-                note = info.get("type", "mismatch")
-                mismatch.append([
-                    sid,
-                    sf_field,
-                    sf_val,
-                    vel_val,
-                    note
-                ])
-
-    # ---------------------------------------------------
-    # EXTRA RECORDS IN VELARIS
-    # ---------------------------------------------------
-    extras = []
-    for _, row in vel_df.iterrows():
-        vid = str(row.get(VEL_ID_COL, "")).strip()
-        if vid and vid.lower() not in seen_ids:
-            extras.append([vid, row.get(VEL_ID_COL, ""), "Extra in Velaris"])
-
-    # ---------------------------------------------------
-    # WRITE REPORTS
-    # ---------------------------------------------------
-    outdir = Path("output/bookings")
-    outdir.mkdir(parents=True, exist_ok=True)
-
-    write_csv(outdir / "mismatch.csv", mismatch,
-              ["Booking ID", "Field", "SF Value", "Velaris Value", "Note"])
-    write_csv(outdir / "missing.csv", missing,
-              ["Booking ID", "Note"])
-    write_csv(outdir / "extra.csv", extras,
-              ["Velaris Booking ID", "Label", "Note"])
-
-    print("[bookings] wrote", len(mismatch), "mismatch rows")
-    print("[bookings] wrote", len(missing), "missing rows")
-    print("[bookings] wrote", len(extras), "extra rows")
+    counts = run_object(validate, state, outdir, "bookings", HEADERS, xlsx, **options)
+
+    print("[bookings] wrote", counts["mismatch"], "mismatch rows")
+    print("[bookings] wrote", counts["missing"], "missing rows")
+    print("[bookings] wrote", counts["extra"], "extra rows")
     print("[bookings] done.")
+    return counts
+
+
+def main(path=None):
+
+    path = path or EXCEL_PATH
+    print("[bookings] loading", path)
+    run(load(path))
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
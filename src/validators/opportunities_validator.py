@@ -1,15 +1,22 @@
 # opportunities_validator.py
-import pandas as pd
+import sys
 from pathlib import Path
-from core.mapping_loader import detect_mapping
-from core.id_detector import candidate_id_column
-from core.comparator import compare_cells
-from core.report_writer import write_csv
+from src.core.mapping_loader import detect_mapping
+from src.core.id_detector import candidate_id_column
+from src.core.engine import build_index, run_object, validate_frames
+from src.core.sheet_loader import read_sheets
 
 EXCEL_PATH = "C:\\Users\\acer\\Desktop\\Velaris_Project\\velaris-data-parity-engine\\data\\opportunities\\Salesforce to Velaris Opportunity _ Uberall.xlsx"
 
-def load_all(path):
-    x = pd.read_excel(path, sheet_name=None, dtype=str, engine="openpyxl")
+OUTPUT_DIR = Path("output/opportunities")
+HEADERS = {
+    "mismatch": ["Opportunity ID","Field","SF_Value","Velaris_Value","Note"],
+    "missing": ["Opportunity ID","Account ID","Note"],
+    "extra": ["Velaris Opportunity ID","Label","Note"],
+}
+
+def load_all(path, progress=None):
+    x = read_sheets(path, progress=progress)  # sheets are parsed concurrently (core.sheet_loader)
     return {k: df.fillna("").astype(str) for k, df in x.items()}
 
 def build_simple_mapping_from_text():
@@ -26,9 +33,8 @@ def build_simple_mapping_from_text():
         "StageName":"Lifecycle Stage"
     }
 
-def main():
-    print("[opportunities] loading", EXCEL_PATH)
-    sheets = load_all(EXCEL_PATH)
+def load(path=EXCEL_PATH, progress=None):
+    sheets = load_all(path, progress)
     # find sheets by name
     sf_df = None; vel_df = None; mapping_df = None; accounts_df = None
     for name, df in sheets.items():
@@ -72,72 +78,44 @@ def main():
             sf_id_col = s; vel_id_col = t; break
     sf_id_col = sf_id_col or candidate_id_column(sf_df.columns)
     vel_id_col = vel_id_col or candidate_id_column(vel_df.columns)
-    print("[opportunities] SF ID:", sf_id_col, "Velaris ID:", vel_id_col)
+    return {
+        "sf_df": sf_df, "vel_df": vel_df, "accounts_df": accounts_df, "mapping": mapping,
+        "sf_id_col": sf_id_col, "vel_id_col": vel_id_col,
+        "vel_index": build_index(vel_df, vel_id_col),
+    }
 
-    # build vel map
-    vel_map = {}
-    for _, r in vel_df.iterrows():
-        key = str(r.get(vel_id_col, "")).strip()
-        if key:
-            # r is a Pandas Series (the row)
-            vel_map[key.lower()] = r
+def account_ids(accounts_df):
+    # Salesforce account ids known to the Velaris accounts sheet
+    if accounts_df is None or "Salesforce Account 18 ID" not in accounts_df.columns:
+        return set()
+    return set([str(x).strip().lower() for x in accounts_df["Salesforce Account 18 ID"].tolist() if str(x).strip()!=""])
 
-    mismatch_rows = [];
-    missing_rows = [];
-    sf_seen = set()
-    for _, r in sf_df.iterrows():
-        sid = str(r.get(sf_id_col, "")).strip()
-        if not sid:
-            continue
-        sf_seen.add(sid.lower())
-        vrow = vel_map.get(sid.lower())
+def validate(state, sink=None, **options):
+    safeids = account_ids(state["accounts_df"])
 
-        # FIX APPLIED HERE: Changed vrow.values() to vrow.values
-        if vrow is None or all([str(x).strip() == "" for x in vrow.values]):
-            acc = str(r.get("Account 18 digit ID", "")) or str(r.get("AccountId", ""))
-            note = "Missing Opportunity"
-            if accounts_df is not None:
-                # check existence of account ids in Velaris accounts sheet
-                try:
-                    safeids = set([str(x).strip().lower() for x in accounts_df.get("Salesforce Account 18 ID", accounts_df.columns[0]).tolist() if str(x).strip()!=""])
-                    if acc.lower() in safeids:
-                        note = "Missing Opportunity — Account exists in Velaris"
-                except Exception:
-                    pass
-            missing_rows.append([sid, acc, note])
-            continue
-        # compare fields
-        for sf_field, vel_field in mapping.items():
-            if sf_field.strip().lower() == sf_id_col.strip().lower():
-                continue
-            if sf_field not in sf_df.columns or vel_field not in vel_df.columns:
-                continue
-            sf_val = r.get(sf_field,"")
-            vel_val = vrow.get(vel_field,"")
-            ok, det = compare_cells(sf_val, vel_val)
-            if not ok:
-                if det.get("type")=="list":
-                    note = f"Missing items: {', '.join(det['missing'])}"
-                    vel_display = ", ".join(det.get("vel_list",[]))
-                else:
-                    note = det.get("type","mismatch")
-                    vel_display = det.get("vel", vel_val)
-                mismatch_rows.append([sid, sf_field, sf_val, vel_display, note])
+    def describe_missing(r):
+        acc = str(r.get("Account 18 digit ID", "")) or str(r.get("AccountId", ""))
+        note = "Missing Opportunity"
+        if acc.lower() in safeids:
+            note = "Missing Opportunity — Account exists in Velaris"
+        return {"Account ID": acc, "Note": note}
 
-    extra_rows=[]
-    for _, vrow in vel_df.iterrows():
-        vid = str(vrow.get(vel_id_col,"")).strip()
-        if not vid: continue
-        if vid.lower() not in sf_seen:
-            label = vel_df.columns[0]
-            extra_rows.append([vid, vrow.get(label,""), "Extra in Velaris"])
+    return validate_frames(
+        state["sf_df"], state["vel_df"], state["mapping"], state["sf_id_col"], state["vel_id_col"],
+        sink=sink, vel_index=state["vel_index"], blank_is_missing=True, describe_missing=describe_missing,
+        **options,
+    )
 
-    outdir = Path("output/opportunities")
-    outdir.mkdir(parents=True, exist_ok=True)
-    write_csv(outdir / "mismatch.csv", mismatch_rows, ["Opportunity ID","Field","SF_Value","Velaris_Value","Note"])
-    write_csv(outdir / "missing.csv", missing_rows, ["Opportunity ID","Account ID","Note"])
-    write_csv(outdir / "extra.csv", extra_rows, ["Velaris Opportunity ID","Label","Note"])
+def run(state, outdir=OUTPUT_DIR, xlsx=False, **options):
+    print("[opportunities] SF ID:", state["sf_id_col"], "Velaris ID:", state["vel_id_col"])
+    counts = run_object(validate, state, outdir, "opportunities", HEADERS, xlsx, **options)
     print("[opportunities] done. Reports written to", outdir)
+    return counts
+
+def main(path=None):
+    path = path or EXCEL_PATH
+    print("[opportunities] loading", path)
+    run(load(path))
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,18 +1,20 @@
 # subscriptions_validator.py
-import pandas as pd
+import sys
 from pathlib import Path
-from core.mapping_loader import detect_mapping, read_simple_mapping
-from core.id_detector import candidate_id_column
-from core.comparator import compare_cells
-from core.report_writer import write_csv
+from src.core.mapping_loader import detect_mapping
+from src.core.id_detector import candidate_id_column
+from src.core.engine import build_index, run_object, validate_frames
+from src.core.sheet_loader import read_sheets
 import os
 
 # Excel path (uploaded earlier)
 EXCEL_PATH = "C:\\Users\\acer\\Desktop\\Velaris_Project\\velaris-data-parity-engine\\data\\subscriptions\\Corporate Subscriptions to Velaris _ Salesforce.xlsx"
 
+OUTPUT_DIR = Path("output/subscriptions")
 
-def load_sheets(path):
-    x = pd.read_excel(path, sheet_name=None, dtype=str, engine="openpyxl")
+
+def load_sheets(path, progress=None):
+    x = read_sheets(path, progress=progress)  # sheets are parsed concurrently (core.sheet_loader)
     return {k: df.fillna("").astype(str) for k, df in x.items()}
 
 
@@ -39,9 +41,8 @@ def build_mapping_from_text():
     return mapping
 
 
-def main():
-    print("[subscriptions] loading workbook:", EXCEL_PATH)
-    sheets = load_sheets(EXCEL_PATH)
+def load(path=EXCEL_PATH, progress=None):
+    sheets = load_sheets(path, progress)
     # get dataframes by name
     sf_df = None;
     vel_df = None;
@@ -91,82 +92,54 @@ def main():
     if not vel_id_col:
         vel_id_col = candidate_id_column(vel_df.columns)
 
-    print("[subscriptions] SF ID column:", sf_id_col, "Velaris ID column:", vel_id_col)
-
-    # build velaris map
-    vel_map = {}
-    for _, r in vel_df.iterrows():
-        # r is a Pandas Series
-        key = str(r.get(vel_id_col, "")).strip()
-        if key:
-            vel_map[key.lower()] = r
-
-    mismatch_rows = []
-    missing_rows = []
-    sf_seen = set()
-    for _, r in sf_df.iterrows():
-        sid = str(r.get(sf_id_col, "")).strip()
-        if not sid:
-            continue
-        sf_seen.add(sid.lower())
-        vrow = vel_map.get(sid.lower())
-
-        # Check if vrow is None (missing) or if all its values are blank
-        # Note: If vrow is a Pandas Series, iterating over it or using .values works.
-        if vrow is None or all(
-                [str(x).strip() == "" for x in vrow.values]):  # Using .values attribute is safer if vrow is Series
-            # check if account exists in Velaris accounts (if provided)
-            account_safe_note = "Missing in Velaris"
-            if accounts_df is not None:
-                acc_id = str(r.get("Account__c", "")).strip()
-                try:
-                    # Note: Assumes 'SafeID' column exists in accounts_df
-                    safeids = set(
-                        [str(x).strip().lower() for x in accounts_df["SafeID"].tolist() if str(x).strip() != ""])
-                    if acc_id.lower() in safeids:
-                        account_safe_note = "Missing subscription but account exists in Velaris"
-                except Exception:
-                    # Failsafe if 'SafeID' column is missing in accounts_df
-                    pass
-            missing_rows.append([sid, account_safe_note])
-            continue
-
-        # compare each mapped field
-        for sf_field, vel_field in mapping.items():
-            if sf_field.strip().lower() == sf_id_col.strip().lower():
-                continue
-            if sf_field not in sf_df.columns or vel_field not in vel_df.columns:
-                continue
-            sf_val = r.get(sf_field, "")
-            vel_val = vrow.get(vel_field, "")
-            ok, det = compare_cells(sf_val, vel_val)
-            if not ok:
-                if det.get("type") == "list":
-                    note = f"Missing items: {', '.join(det['missing'])}"
-                    vel_display = ", ".join(det.get("vel_list", []))
-                else:
-                    note = det.get("type", "mismatch")
-                    vel_display = det.get("vel", vel_val)
-                mismatch_rows.append([sid, sf_field, sf_val, vel_display, note])
-
-    # extras
-    extra_rows = []
-    for _, vrow in vel_df.iterrows():
-        vid = str(vrow.get(vel_id_col, "")).strip()
-        if not vid:
-            continue
-        if vid.lower() not in sf_seen:
-            label = vel_df.columns[0]
-            extra_rows.append([vid, vrow.get(label, ""), "Extra in Velaris"])
-
-    # write outputs
-    outdir = Path("output/subscriptions")
-    outdir.mkdir(parents=True, exist_ok=True)
-    write_csv(outdir / "mismatch.csv", mismatch_rows, ["ID", "Field", "SF_Value", "Velaris_Value", "Note"])
-    write_csv(outdir / "missing.csv", missing_rows, ["ID", "Note"])
-    write_csv(outdir / "extra.csv", extra_rows, ["Velaris_ID", "Label", "Note"])
+    return {
+        "sf_df": sf_df,
+        "vel_df": vel_df,
+        "accounts_df": accounts_df,
+        "mapping": mapping,
+        "sf_id_col": sf_id_col,
+        "vel_id_col": vel_id_col,
+        # build velaris ID index
+        "vel_index": build_index(vel_df, vel_id_col),
+    }
+
+
+def account_safeids(accounts_df):
+    # Note: Assumes 'SafeID' column exists in accounts_df
+    if accounts_df is None or "SafeID" not in accounts_df.columns:
+        return set()
+    return set([str(x).strip().lower() for x in accounts_df["SafeID"].tolist() if str(x).strip() != ""])
+
+
+def validate(state, sink=None, **options):
+    safeids = account_safeids(state["accounts_df"])
+
+    def describe_missing(r):
+        # check if account exists in Velaris accounts (if provided)
+        acc_id = str(r.get("Account__c", "")).strip()
+        if acc_id.lower() in safeids:
+            return {"Note": "Missing subscription but account exists in Velaris"}
+        return {"Note": "Missing in Velaris"}
+
+    return validate_frames(
+        state["sf_df"], state["vel_df"], state["mapping"], state["sf_id_col"], state["vel_id_col"],
+        sink=sink, vel_index=state["vel_index"], blank_is_missing=True, describe_missing=describe_missing,
+        **options,
+    )
+
+
+def run(state, outdir=OUTPUT_DIR, xlsx=False, **options):
+    print("[subscriptions] SF ID column:", state["sf_id_col"], "Velaris ID column:", state["vel_id_col"])
+    counts = run_object(validate, state, outdir, "subscriptions", xlsx=xlsx, **options)
     print("[subscriptions] done. Reports written to", outdir)
+    return counts
+
+
+def main(path=None):
+    path = path or EXCEL_PATH
+    print("[subscriptions] loading workbook:", path)
+    run(load(path))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
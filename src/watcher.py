@@ -0,0 +1,100 @@
+"""
+watcher.py
+Watch mode: keeps one interpreter alive, polls data/<object>/ for refreshed workbooks and
+re-validates only the object whose files changed, rewriting output/<object>/.
+Parsed sheets stay in memory keyed by their content (core.parse_cache, bounded by --max-memory-mb), so
+a rerun skips the interpreter start + pandas import and re-parses only the sheets that changed; an
+untouched Velaris or mapping sheet comes back without touching openpyxl.
+Usage (from the repo root):
+  python -m src.watcher [--data-dir data] [--output-dir output] [--debounce 2] [--max-memory-mb 1024]
+"""
+
+import argparse
+import importlib
+import time
+from pathlib import Path
+
+from src.core import parse_cache
+from src.validators import VALIDATORS, find_workbook, is_workbook
+
+DATA_DIR = Path("data")
+OUTPUT_DIR = Path("output")
+POLL_INTERVAL = 1.0  # seconds between directory scans
+DEBOUNCE = 2.0  # seconds a directory must stay quiet before we re-validate
+MAX_MEMORY_MB = 1024
+
+
+def snapshot(folder):
+    """(name, mtime, size) of every workbook find_workbook could pick; any difference means a change.
+    Excel's ~$ lock files and sibling exports (.csv) come and go without a re-validation."""
+    folder = Path(folder)
+    if not folder.is_dir():
+        return frozenset()
+    return frozenset((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in folder.iterdir()
+                     if p.is_file() and is_workbook(p))
+
+
+def revalidate(name, data_dir, output_dir, cache):
+    path = find_workbook(Path(data_dir) / name)
+    if path is None:
+        print(f"[watch] {name}: no workbook in {Path(data_dir) / name}, skipping")
+        return None
+    module = importlib.import_module(VALIDATORS[name])
+    started = time.perf_counter()
+    try:
+        state = module.load(path)
+        res = module.run(state, Path(output_dir) / name)
+    except Exception as e:
+        print(f"[watch] {name}: ERROR processing {path.name}: {e}")
+        return None
+    print(f"[watch] {name}: revalidated {path.name} in {time.perf_counter() - started:.2f}s "
+          f"(parsed sheets kept {cache.total_bytes() / 1e6:.1f} MB)")
+    return res
+
+
+def watch(data_dir=DATA_DIR, output_dir=OUTPUT_DIR, objects=None, interval=POLL_INTERVAL, debounce=DEBOUNCE,
+          max_memory_mb=MAX_MEMORY_MB):
+    objects = list(objects or VALIDATORS)
+    cache = parse_cache.keep_warm(int(max_memory_mb * 1024 * 1024))
+    seen = {}
+    for name in objects:
+        seen[name] = snapshot(Path(data_dir) / name)
+        revalidate(name, data_dir, output_dir, cache)
+
+    print(f"[watch] watching {', '.join(objects)} under {data_dir} (Ctrl+C to stop)")
+    pending = {}  # object -> time of its latest change
+    try:
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            for name in objects:
+                snap = snapshot(Path(data_dir) / name)
+                if snap != seen[name]:
+                    seen[name] = snap
+                    pending[name] = now
+            for name, changed_at in list(pending.items()):
+                # debounce: exports are often written in several steps, wait until the folder settles
+                if now - changed_at >= debounce:
+                    del pending[name]
+                    revalidate(name, data_dir, output_dir, cache)
+    except KeyboardInterrupt:
+        print("[watch] stopped")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Re-validate objects whenever their data files change.")
+    ap.add_argument("objects", nargs="*", help=f"objects to watch: {', '.join(VALIDATORS)} (default: all)")
+    ap.add_argument("--data-dir", default=str(DATA_DIR))
+    ap.add_argument("--output-dir", default=str(OUTPUT_DIR))
+    ap.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between scans")
+    ap.add_argument("--debounce", type=float, default=DEBOUNCE, help="quiet seconds before re-validating")
+    ap.add_argument("--max-memory-mb", type=float, default=MAX_MEMORY_MB, help="ceiling for parsed sheets kept in memory")
+    args = ap.parse_args(argv)
+    unknown = [o for o in args.objects if o not in VALIDATORS]
+    if unknown:
+        ap.error(f"unknown object(s): {', '.join(unknown)}")
+    watch(args.data_dir, args.output_dir, args.objects, args.interval, args.debounce, args.max_memory_mb)
+
+
+if __name__ == "__main__":
+    main()
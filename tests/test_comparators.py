@@ -0,0 +1,71 @@
+# Compiled per-field compare rules (core.comparators) on small columns.
+import pandas as pd
+import pytest
+
+from src.core.comparators import compile_rule, compile_rules, to_days
+
+
+def run(spec, sf, vel):
+    ok, kind, sf_shown, vel_shown = compile_rule(spec)(pd.Series(sf, dtype=object), pd.Series(vel, dtype=object))
+    kinds = [kind] * len(sf) if isinstance(kind, str) else list(kind)
+    return list(ok), kinds
+
+
+def test_year_first_cells_are_year_month_day_whatever_dayfirst_says():
+    days = to_days(pd.Series(["2024-01-05", "2024-1-5", "2024/01/05 10:00", "2024-01-05T23:30:00Z",
+                              "05/01/2024", "45296", ""]), dayfirst=True)
+    dates = [d.strftime("%Y-%m-%d") if pd.notna(d) else None for d in days]
+    assert dates == ["2024-01-05"] * 5 + [None, None]  # numbers and blanks are never dates
+    assert to_days(pd.Series(["05/01/2024"]), dayfirst=False)[0].strftime("%Y-%m-%d") == "2024-05-01"
+
+
+def test_date_rule_window_and_dayfirst():
+    ok, kinds = run({"type": "date", "window_days": 1}, ["2024-01-05", "2024-01-05", "01/04/2025", "n/a", ""],
+                    ["06/01/2024", "2024-01-08", "2025-04-01", "N/A", "2024-01-01"])
+    assert ok == [True, False, True, True, False]
+    assert kinds[:2] == ["date", "date"] and kinds[4] == "string"
+    assert run({"type": "date", "dayfirst": False}, ["01/04/2025"], ["2025-01-04"])[0] == [True]
+
+
+def test_number_rule_tolerances():
+    ok, kinds = run({"type": "number", "rel_tol": 0.005}, ["1,000", "1000", "1000", "abc", ""],
+                    ["1004.9", "1006", "1000.0", "ABC", "0"])
+    assert ok == [True, False, True, True, False]
+    assert kinds == ["number", "number", "number", "string", "string"]
+    assert run({"type": "number", "abs_tol": 0.01}, ["0.10", "0.10"], ["0.109", "0.12"])[0] == [True, False]
+
+
+def test_amount_rule_currencies():
+    ok, kinds = run("amount", ["$1,200.00", "USD 1200", "1200 EUR", "£5", "7"], ["1200", "1200.004", "1200 GBP", "GBP 5", "7.01"])
+    assert ok == [True, True, False, True, False]
+    assert kinds[2] == "currency" and kinds[4] == "number"  # same amount, other currency / other amount
+    rule = {"type": "amount", "default_currency": "GBP"}
+    assert run(rule, ["1200", "1200"], ["£1200", "$1200"])[0] == [True, False]  # bare numbers are GBP
+
+
+def test_string_and_exact_rules():
+    assert run("string", ["  Acme ", "a  b"], ["acme", "A B"])[0] == [True, False]
+    assert run({"type": "string", "collapse_whitespace": True}, ["a  b"], ["A B"])[0] == [True]
+    assert run({"type": "string", "case_sensitive": True}, ["Acme"], ["acme"])[0] == [False]
+    assert run("exact", ["Acme", "Acme "], ["Acme", "Acme"])[0] == [True, False]
+
+
+def test_compile_rules_rejects_bad_specs():
+    mapping = {"Amount": "ACV", "Close": "Close Date"}
+    assert set(compile_rules(mapping, {"Amount": "number", "Close": {"type": "date"}})) == {"Amount", "Close"}
+    with pytest.raises(ValueError, match="unmapped field"):
+        compile_rules(mapping, {"Owner": "string"})
+    with pytest.raises(ValueError, match="unknown compare rule 'money'"):
+        compile_rules(mapping, {"Amount": "money"})
+    with pytest.raises(ValueError, match="Amount: bad options"):
+        compile_rules(mapping, {"Amount": {"type": "number", "tolerance": 1}})
+
+
+def test_validate_frames_compares_ruled_fields_with_their_kernel():
+    from src.core.engine import validate_frames
+    sf = pd.DataFrame({"Id": ["a", "b"], "ACV": ["1000", "1000"], "Close": ["2024-01-05", "2024-01-05"]})
+    vel = pd.DataFrame({"ID": ["a", "b"], "ACV": ["1004", "1100"], "Close": ["05/01/2024", "2024-01-07"]})
+    mapping = {"Id": "ID", "ACV": "ACV", "Close": "Close"}
+    res = validate_frames(sf, vel, mapping, "Id", "ID",
+                          rules={"ACV": {"type": "number", "rel_tol": 0.005}, "Close": "date"})
+    assert res["mismatch"][["ID", "Field", "Note"]].values.tolist() == [["b", "ACV", "number"], ["b", "Close", "date"]]
@@ -0,0 +1,102 @@
+# Connector protocol against core.mock_api on a free local port: retries, Retry-After, paging, errors.
+import time
+
+import pytest
+
+from src.core.connectors import ConnectorError, HttpSession, fetch_frame
+from src.core.mock_api import MockApi
+
+RECORDS = [{"Id": f"a{n:04d}", "Name": f"Account {n}", "Tags": ["x", "y"] if n % 7 == 0 else None}
+           for n in range(1, 1001)]
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**options):
+        servers.append(MockApi({"Account": RECORDS}, port=0, **options).start())
+        return servers[-1]
+
+    yield start
+    for srv in servers:
+        srv.stop()
+
+
+def ids(df):
+    return df["Id"].tolist()
+
+
+def test_pages_arrive_in_order_under_concurrency(serve):
+    srv = serve(latency=0.002)
+    df = fetch_frame(srv.url, "Account", ["Id", "Name", "Tags"], page_size=7, workers=8)
+    assert ids(df) == [r["Id"] for r in RECORDS]
+    assert list(df.columns) == ["Id", "Name", "Tags"]
+    assert df["Tags"].iloc[6] == "x, y" and df["Tags"].iloc[0] == ""
+    assert len(srv.clients) <= 8 + 1  # keep-alive: one connection per worker thread, plus page 1
+
+
+def test_cursor_paging(serve):
+    srv = serve(cursor=True)
+    df = fetch_frame(srv.url, "Account", ["Id"], page_size=300)
+    assert ids(df) == [r["Id"] for r in RECORDS]
+    assert srv.requests == 4
+
+
+def test_retries_on_503(serve):
+    srv = serve(fail_every=3)
+    session = HttpSession(srv.url, backoff=0)
+    try:
+        df = fetch_frame(srv.url, "Account", ["Id"], page_size=50, workers=4, session=session)
+    finally:
+        session.close()
+    assert ids(df) == [r["Id"] for r in RECORDS]
+    assert srv.failed > 0
+
+
+def test_gives_up_after_retries(serve):
+    srv = serve(fail_every=1)
+    with pytest.raises(ConnectorError, match="gave up after 3 attempts .*HTTP 503"):
+        HttpSession(srv.url, retries=2, backoff=0).get_json("Account")
+    assert srv.requests == 3
+
+
+def test_retry_after_is_honoured(serve):
+    srv = serve(fail_every=2, retry_after="0.3")
+    session = HttpSession(srv.url, backoff=0)
+    session.get_json("Account")  # request 1
+    start = time.monotonic()
+    session.get_json("Account")  # request 2 answers 503, the retry waits as told
+    assert time.monotonic() - start >= 0.3
+
+    srv = serve(fail_every=2, retry_after="0")
+    session = HttpSession(srv.url, backoff=30)  # Retry-After wins over the backoff
+    session.get_json("Account")
+    start = time.monotonic()
+    session.get_json("Account")
+    assert time.monotonic() - start < 5
+
+
+def test_retry_after_is_capped(serve):
+    srv = serve(fail_every=2, retry_after="3600")
+    session = HttpSession(srv.url, max_retry_after=0.1)
+    session.get_json("Account")
+    start = time.monotonic()
+    session.get_json("Account")
+    assert time.monotonic() - start < 5
+    assert session.delay(1, None) < 5  # connection errors still use the backoff
+
+
+def test_unknown_object_is_404(serve):
+    srv = serve()
+    with pytest.raises(ConnectorError, match="HTTP 404"):
+        fetch_frame(srv.url, "Contact", ["Id"])
+    assert srv.requests == 1  # not retried
+
+
+@pytest.mark.parametrize("fields, page_size", [(["Id", "Nope"], 100), (["Id"], 0)])
+def test_bad_request_is_400(serve, fields, page_size):
+    srv = serve()
+    with pytest.raises(ConnectorError, match="HTTP 400"):
+        fetch_frame(srv.url, "Account", fields, page_size=page_size)
+    assert srv.requests == 1
@@ -0,0 +1,92 @@
+# Run-over-run delta (core.delta) and the cleanup of reports a run does not produce.
+import pandas as pd
+
+from src.core.delta import INDEX_FILE, compute_delta, delta_sink, load_index, remove_stale, save_index
+from src.core.report_writer import tee, xlsx_sink
+
+
+def results(mismatch=(), missing=(), extra=()):
+    return {
+        "mismatch": pd.DataFrame(list(mismatch), columns=["ID", "Field", "SF Value", "Velaris Value", "Note"]),
+        "missing": pd.DataFrame(list(missing), columns=["ID", "Note"]),
+        "extra": pd.DataFrame(list(extra), columns=["Velaris ID", "Label", "Note"]),
+        "summary": {},
+    }
+
+
+def test_report_xlsx_of_an_earlier_run_is_removed(tmp_path):
+    run = results(missing=[["a1", "Missing in Velaris"]])
+    tee(delta_sink(tmp_path, xlsx=True), xlsx_sink(tmp_path))(run)
+    assert (tmp_path / "report.xlsx").exists()
+    delta_sink(tmp_path, xlsx=True)(run)  # the xlsx sink runs after it
+    assert (tmp_path / "report.xlsx").exists()
+    delta_sink(tmp_path)(run)
+    assert not (tmp_path / "report.xlsx").exists()
+    assert (tmp_path / "missing.csv").exists()
+
+
+def test_new_and_resolved_against_the_previous_run():
+    first = results(mismatch=[["a1", "Amount", "10", "12", "mismatch"], ["a2", "Amount", "5", "6", "mismatch"]],
+                    missing=[["a3", "Missing in Velaris"]])
+    delta, index = compute_delta(first, None)
+    assert len(delta["new_mismatch"]) == 2 and delta["resolved_mismatch"].empty  # first run: all new
+
+    second = results(mismatch=[["A1 ", "Amount", "10", "12", "mismatch"], ["a4", "Name", "x", "y", "mismatch"]])
+    delta, index = compute_delta(second, index)
+    assert delta["new_mismatch"]["ID"].tolist() == ["a4"]  # case / whitespace changes are not new
+    assert delta["resolved_mismatch"].values.tolist() == [["a2", "Amount"]]
+    assert delta["resolved_missing"].values.tolist() == [["a3"]]
+    assert list(delta["resolved_missing"].columns) == ["ID"]
+
+
+def test_empty_tables_keep_their_columns():
+    delta, _ = compute_delta(results(), None)
+    assert list(delta["new_mismatch"].columns) == ["ID", "Field", "SF Value", "Velaris Value", "Note"]
+    assert list(delta["resolved_extra"].columns) == ["Velaris ID"]
+
+
+def test_capped_or_sampled_runs_leave_the_mismatch_index_alone():
+    _, index = compute_delta(results(mismatch=[["a1", "Amount", "10", "12", "mismatch"]]), None)
+    for extra_table in ("counts", "sample"):
+        capped = {**results(missing=[["a9", "Missing in Velaris"]]), extra_table: pd.DataFrame()}
+        delta, after = compute_delta(capped, index)
+        assert "new_mismatch" not in delta and "new_missing" in delta
+        assert after["mismatch"] == index["mismatch"]
+
+
+def test_cancelled_runs_are_not_diffed():
+    cancelled = {**results(missing=[["a9", "Missing in Velaris"]]), "summary": {"cancelled": "compare"}}
+    _, index = compute_delta(results(missing=[["a1", "Missing in Velaris"]]), None)
+    delta, after = compute_delta(cancelled, index)
+    assert delta == {} and after == index
+
+
+def test_index_survives_between_runs(tmp_path):
+    _, index = compute_delta(results(extra=[["v1", "Label", "Extra in Velaris"]]), None)
+    save_index(tmp_path / INDEX_FILE, index)
+    assert load_index(tmp_path / INDEX_FILE) == index
+    assert load_index(tmp_path / "absent.pkl") is None
+    (tmp_path / "broken.pkl").write_bytes(b"not a pickle")
+    assert load_index(tmp_path / "broken.pkl") is None  # treated as a first run
+
+
+def test_capped_run_removes_stale_mismatch_delta_and_plain_run_removes_counts(tmp_path):
+    plain = results(mismatch=[["a1", "Amount", "10", "12", "mismatch"]])
+    delta_sink(tmp_path)(plain)
+    assert (tmp_path / "new_mismatch.csv").exists()
+
+    capped = {**plain, "counts": pd.DataFrame([["Amount", "Amount", 1, 1, 1]])}
+    delta_sink(tmp_path)(capped)
+    assert not (tmp_path / "new_mismatch.csv").exists() and not (tmp_path / "resolved_mismatch.csv").exists()
+    assert (tmp_path / "counts.csv").exists() and (tmp_path / "new_missing.csv").exists()
+
+    delta_sink(tmp_path)(plain)
+    assert not (tmp_path / "counts.csv").exists()
+    assert pd.read_csv(tmp_path / "new_mismatch.csv").empty  # the index still knew a1 from the first run
+
+
+def test_remove_stale_keeps_what_the_run_produced(tmp_path):
+    for name in ("new_missing", "resolved_missing", "sample", "counts"):
+        (tmp_path / f"{name}.csv").write_text("x\n")
+    remove_stale(tmp_path, {"new_missing": None, "sample": None})
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new_missing.csv", "sample.csv"]
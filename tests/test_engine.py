@@ -0,0 +1,79 @@
+# engine.validate_frames: mismatch caps, fail-fast, and the CLI checks on their options.
+import pandas as pd
+import pytest
+
+from src.cli import main
+from src.core.engine import ParityAborted, validate_frames
+from src.core.pipeline import validate_stream
+
+MAPPING = {"Id": "ID", "Amount": "Amount", "Name": "Name"}
+N = 300
+
+
+def frames(bad_amounts=N, bad_names=10):
+    ids = [f"r{n:03d}" for n in range(N)]
+    sf = pd.DataFrame({"Id": ids, "Amount": [str(n) for n in range(N)], "Name": ["Acme"] * N})
+    vel = pd.DataFrame({"ID": ids,
+                        "Amount": [str(n + 1) if n < bad_amounts else str(n) for n in range(N)],
+                        "Name": ["Beta" if n < bad_names else "Acme" for n in range(N)]})
+    return sf, vel
+
+
+def test_caps_limit_detail_rows_but_not_the_counts():
+    sf, vel = frames()
+    res = validate_frames(sf, vel, MAPPING, "Id", "ID", max_per_field=3)
+    assert res["mismatch"].groupby("Field").size().to_dict() == {"Amount": 3, "Name": 3}
+    counts = res["counts"].set_index("Field")
+    assert counts.loc["Amount", "Mismatches"] == N and counts.loc["Name", "Mismatches"] == 10
+    assert counts.loc["Amount", "Detail_Rows"] == 3
+
+    res = validate_frames(sf, vel, MAPPING, "Id", "ID", max_details=5)
+    assert res["mismatch"][["ID", "Field"]].values.tolist() == [
+        ["r000", "Amount"], ["r000", "Name"], ["r001", "Amount"], ["r001", "Name"], ["r002", "Amount"]]
+
+    res = validate_frames(sf, vel, MAPPING, "Id", "ID", max_details=0)
+    assert res["mismatch"].empty and res["counts"]["Mismatches"].sum() == N + 10
+    assert "counts" not in validate_frames(sf, vel, MAPPING, "Id", "ID")
+
+
+def test_streamed_caps_match_the_in_memory_run(tmp_path):
+    sf, vel = frames()
+    chunks = [sf.iloc[i:i + 40] for i in range(0, N, 40)]
+    validate_stream(iter(chunks), vel, MAPPING, "Id", "ID", outdir=tmp_path, max_per_field=4, max_details=6)
+    whole = validate_frames(sf, vel, MAPPING, "Id", "ID", max_per_field=4, max_details=6)
+    streamed = pd.read_csv(tmp_path / "mismatch.csv", dtype=str)
+    assert streamed.values.tolist() == whole["mismatch"].astype(str).values.tolist()
+    assert pd.read_csv(tmp_path / "counts.csv")["Mismatches"].tolist() == whole["counts"]["Mismatches"].tolist()
+
+
+def test_fail_fast_aborts_on_a_broken_field():
+    sf, vel = frames()
+    with pytest.raises(ParityAborted, match="'Amount' -> 'Amount'") as info:
+        validate_frames(sf, vel, MAPPING, "Id", "ID", fail_fast=0.9, fail_min_rows=50)
+    assert (info.value.field, info.value.compared, info.value.mismatches) == ("Amount", 50, 50)
+    assert "r000" in str(info.value)  # examples of the mismatching values
+
+
+def test_fail_fast_judges_only_the_first_rows():
+    sf, vel = frames(bad_amounts=40)
+    res = validate_frames(sf, vel, MAPPING, "Id", "ID", fail_fast=0.9, fail_min_rows=200)  # 40/200
+    assert len(res["mismatch"]) == 50
+    with pytest.raises(ParityAborted):
+        validate_frames(sf, vel, MAPPING, "Id", "ID", fail_fast=0.9, fail_min_rows=40)  # 40/40
+    small_sf, small_vel = sf.iloc[:20], vel.iloc[:20]
+    with pytest.raises(ParityAborted) as info:  # fewer records than fail_min_rows: all of them count
+        validate_frames(small_sf, small_vel, MAPPING, "Id", "ID", fail_fast=1.0)
+    assert info.value.compared == 20
+
+
+@pytest.mark.parametrize("argv, message", [
+    (["--fail-fast", "0"], "--fail-fast must be in (0, 1]"),
+    (["--fail-fast", "1.5"], "--fail-fast must be in (0, 1]"),
+    (["--max-per-field", "-1"], "--max-per-field must be 0 or more"),
+    (["--max-details", "-2"], "--max-details must be 0 or more"),
+])
+def test_cli_rejects_out_of_range_options(capsys, argv, message):
+    with pytest.raises(SystemExit) as info:
+        main(["run", "subscriptions", *argv])
+    assert info.value.code == 2
+    assert message in capsys.readouterr().err
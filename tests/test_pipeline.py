@@ -0,0 +1,66 @@
+# Staged pipeline helpers (core.pipeline): the background reader must not outlive its consumer.
+import threading
+import time
+
+import pytest
+
+from src.core.pipeline import background
+
+
+def reader_threads():
+    return [t for t in threading.enumerate() if t.name == "reader"]
+
+
+def wait_for_readers(timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while reader_threads() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return reader_threads()
+
+
+def test_items_arrive_in_order_and_errors_reach_the_consumer():
+    assert list(background(iter(range(50)), maxsize=2)) == list(range(50))
+
+    def failing():
+        yield 1
+        raise ValueError("bad chunk")
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        list(background(failing()))
+    assert not wait_for_readers()
+
+
+def test_reader_stops_and_closes_its_generator_when_the_consumer_leaves():
+    closed = threading.Event()
+
+    def chunks():
+        try:
+            for n in range(1000):
+                yield n
+        finally:
+            closed.set()  # iter_sheet_chunks closes its workbook here
+
+    items = background(chunks(), maxsize=2)
+    assert next(items) == 0
+    items.close()
+    assert closed.wait(2.0)
+    assert not wait_for_readers()
+
+
+def test_reader_error_after_the_consumer_left_does_not_block():
+    full = threading.Event()
+    left = threading.Event()
+
+    def chunks():
+        yield 0
+        yield 1
+        full.set()  # 1 is in the queue (maxsize 1): nothing more fits
+        left.wait(2.0)
+        raise RuntimeError("nobody is reading any more")
+
+    items = background(chunks(), maxsize=1)
+    assert next(items) == 0
+    assert full.wait(2.0)
+    items.close()
+    left.set()
+    assert not wait_for_readers()
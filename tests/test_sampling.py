@@ -0,0 +1,56 @@
+# Deterministic stratified sampling and the rate estimates reported by run --sample (core.sampling).
+import pandas as pd
+import pytest
+
+from src.core.engine import validate_frames
+from src.core.sampling import MIN_PER_STRATUM, choose_sample, estimate_rate, wilson_interval
+
+KEYS = [f"a{n:05d}" for n in range(20000)]
+
+
+def test_sample_is_deterministic_and_close_to_the_rate():
+    picked, population, sampled, _ = choose_sample(KEYS, 0.1)
+    assert choose_sample(list(reversed(KEYS)), 0.1)[0] == sorted(len(KEYS) - 1 - k for k in picked)
+    assert picked == sorted(picked)
+    assert population == {"": 20000} and sampled == {"": len(picked)}
+    assert 1800 < len(picked) < 2200
+    assert choose_sample(KEYS, 1.0)[0] == list(range(len(KEYS)))
+
+
+def test_every_stratum_gets_a_usable_sample():
+    labels = ["big"] * 19950 + ["small"] * 40 + ["tiny"] * 10
+    picked, population, sampled, stratum_of = choose_sample(KEYS, 0.01, labels)
+    assert population == {"big": 19950, "small": 40, "tiny": 10}
+    assert sampled["small"] == MIN_PER_STRATUM and sampled["tiny"] == 10  # topped up / taken whole
+    assert 150 < sampled["big"] < 250
+    assert sum(stratum_of[k] == "tiny" for k in picked) == 10
+
+
+def test_wilson_interval():
+    assert wilson_interval(0.5, 0) == (0.0, 1.0)
+    low, high = wilson_interval(0.5, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4) and high == pytest.approx(0.5962, abs=1e-4)
+    low, high = wilson_interval(0.0, 100)
+    assert low == 0.0 and 0.03 < high < 0.04  # no mismatches seen is not "certainly none"
+
+
+def test_estimate_rate_weights_strata_and_applies_the_finite_population_correction():
+    rate, _, _ = estimate_rate({"a": 10, "b": 0}, {"a": 100, "b": 900}, {"a": 50, "b": 50})
+    assert rate == pytest.approx(0.02)  # 0.2 in a stratum holding 10% of the records
+    assert estimate_rate({"": 5}, {"": 50}, {"": 50}) == (0.1, 0.1, 0.1)  # census
+    _, low_small, high_small = estimate_rate({"": 10}, {"": 120}, {"": 100})
+    _, low_large, high_large = estimate_rate({"": 10}, {"": 10 ** 6}, {"": 100})
+    assert high_small - low_small < high_large - low_large
+    _, low, high = estimate_rate({}, {"": 1000}, {"": 100})
+    assert low == 0.0 and high > 0
+
+
+def test_sampled_run_keeps_missing_and_extra_exact():
+    ids = [f"r{n}" for n in range(500)]
+    sf = pd.DataFrame({"Id": ids + ["only-sf"], "Amount": ["1"] * 250 + ["2"] * 251})
+    vel = pd.DataFrame({"ID": ids + ["only-vel"], "Amount": ["1"] * 501})
+    res = validate_frames(sf, vel, {"Id": "ID", "Amount": "Amount"}, "Id", "ID", sample=0.2)
+    assert res["missing"]["ID"].tolist() == ["only-sf"] and res["extra"]["Velaris_ID"].tolist() == ["only-vel"]
+    row = res["sample"].iloc[0]
+    assert row["Matched"] == 500 and row["Sampled"] < 500 and row["CI_Low"] <= 0.5 <= row["CI_High"]
+    assert res["summary"]["sampled"] is True